@@ -12,7 +12,202 @@ try:
     from Config import DEBUG
 except Exception:
     DEBUG = False
+# デバッグ出力は `if __debug__ and DEBUG:` で囲む (python -O では分岐ごと消える)
+import os
+import re
+import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+
+# 連結成分ラベリングのアルゴリズム (Spaghetti: ブロック走査 + SIMD 化された SecondScan)。
+# 古い OpenCV で *WithAlgorithm が無い場合は既定の関数にフォールバックする。
+CCL_ALGORITHM = getattr(cv2, "CCL_SPAGHETTI", getattr(cv2, "CCL_DEFAULT", -1))
+
+
+# 4 近傍 (十字) の 3x3 構造要素
+_CROSS_KERNEL = cv2.getStructuringElement(cv2.MORPH_CROSS, (3, 3))
+
+
+def _parallel_framework(build_info):
+    """cv2.getBuildInformation() の "Parallel framework:" 行の値 (無ければ "")。"""
+    m = re.search(r"Parallel framework:[ \t]*(.*)", build_info)
+    return m.group(1).strip() if m else ""
+
+
+def _init_cv_threads():
+    """
+    OpenCV 内部の並列数を設定し、(OpenCV スレッド数, 色グループの並列数) を返す。
+
+    ビルドの既定値が 1 のこともあるので明示的に設定する (CCL の並列版は
+    並列フレームワークが有効なときだけ使われる)。色グループのスレッドプールと
+    掛け合わせて概ねコア数になるよう、OpenCV 側をコア数の半分 (最大 8) にして
+    2 コア以上ならグループの並列も 2 以上残す。
+
+    cv2.setNumThreads はプロセス全体の設定なので、このモジュールを import した時点で
+    UI 側の処理 (フル解像度のリサイズ・境界線のブレンド・Canny など) も同じ並列数で動く。
+    並列フレームワークが TBB でなければ、import 時に 1 回だけ標準エラーに知らせる。
+    """
+    cpu = os.cpu_count() or 1
+    try:
+        cv2.setNumThreads(max(1, min(8, cpu // 2)))
+        cv_threads = max(1, cv2.getNumThreads())
+        framework = _parallel_framework(cv2.getBuildInformation())
+        if "TBB" not in framework.upper():
+            print(f"[CalcCentroid] OpenCV の並列フレームワークが TBB ではありません ({framework or 'なし'})。"
+                  "連結成分ラベリングを速くするには TBB 有効の OpenCV ビルドを使ってください", file=sys.stderr)
+        if __debug__ and DEBUG:
+            print(f"[DEBUG][CalcCentroid] OpenCV parallel framework: {framework or 'none'}, threads={cv_threads}")
+    except Exception:
+        cv_threads = 1
+    return cv_threads, max(1, cpu // cv_threads)
+
+
+CV_NUM_THREADS, GROUP_WORKERS = _init_cv_threads()
+
+
+def connected_components_with_stats(mask, connectivity=4, labels=None):
+    """
+    cv2.connectedComponentsWithStats を CCL_ALGORITHM 指定で呼ぶ。
+
+    labels に同じ大きさの int32 配列を渡すと、ラベル画像はそこへ書き込まれる。
+    """
+    try:
+        return cv2.connectedComponentsWithStatsWithAlgorithm(mask, connectivity, cv2.CV_32S, CCL_ALGORITHM, labels=labels)
+    except AttributeError:
+        return cv2.connectedComponentsWithStats(mask, labels=labels, connectivity=connectivity)
+
+
+def connected_components(mask, connectivity=4):
+    """cv2.connectedComponents を CCL_ALGORITHM 指定で呼ぶ。"""
+    try:
+        return cv2.connectedComponentsWithAlgorithm(mask, connectivity, cv2.CV_32S, CCL_ALGORITHM)
+    except AttributeError:
+        return cv2.connectedComponents(mask, connectivity=connectivity)
+
+
+def _fill_label_holes(labels, edge_idx, edge_lab):
+    """
+    ラベル画像の各成分の穴 (成分に囲まれた背景 0 の領域) を塗った画像を返す。
+
+    穴を持ち得る成分は、前景全体を findContours(RETR_CCOMP) したときの穴の輪郭上の
+    画素のラベルに限られる。その成分ごとに外接矩形内で単独の findContours(RETR_EXTERNAL)
+    を塗りつぶし、成分を単独で findContours したときと同じ穴を求める
+    (複数の成分が斜めに接してできた囲みも、外側の成分単独で囲んでいれば穴になる)。
+
+    Args:
+        labels: ラベル画像 (int32, 0 が背景)
+        edge_idx, edge_lab: labels の境界画素 (外接矩形を求めるのに使う)
+
+    Returns:
+        (穴の画素にその成分の番号を入れた int32 画像 (それ以外は 0), edge_lab のうち
+        穴を持ち得る成分の画素を示す bool 配列)。穴が無ければ None
+    """
+    fg = cv2.compare(labels, 0, cv2.CMP_GT)
+    contours, hierarchy = cv2.findContours(fg, cv2.RETR_CCOMP, cv2.CHAIN_APPROX_SIMPLE)
+    if hierarchy is None:
+        return None
+    holes = [contours[i] for i in np.flatnonzero(hierarchy[0, :, 3] >= 0)]
+    if not holes:
+        return None
+    pts = np.concatenate(holes).reshape(-1, 2)
+    owners = np.unique(labels[pts[:, 1], pts[:, 0]])
+    owners = owners[owners > 0]
+    if len(owners) == 0:
+        return None
+
+    # 候補成分の外接矩形 (成分の端の画素は必ず境界画素)
+    sel = np.isin(edge_lab, owners)
+    lab = edge_lab[sel]
+    ys, xs = np.divmod(edge_idx[sel], labels.shape[1])
+    order = np.argsort(lab, kind="stable")
+    lab, ys, xs = lab[order], ys[order], xs[order]
+    starts = np.flatnonzero(np.r_[True, lab[1:] != lab[:-1]])
+    y0 = np.minimum.reduceat(ys, starts)
+    y1 = np.maximum.reduceat(ys, starts) + 1
+    x0 = np.minimum.reduceat(xs, starts)
+    x1 = np.maximum.reduceat(xs, starts) + 1
+
+    hole_fill = np.zeros_like(labels)
+    # 内側の成分を先に塗る (外側の成分の穴の中にある成分の穴を外側の番号で塗らない)
+    for i in np.argsort((y1 - y0) * (x1 - x0), kind="stable"):
+        value = lab[starts[i]]
+        win = np.s_[y0[i]:y1[i], x0[i]:x1[i]]
+        sub_lab = labels[win]
+        comp = (sub_lab == value).astype(np.uint8)
+        outer, _ = cv2.findContours(comp, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        solid = np.zeros_like(comp)
+        cv2.drawContours(solid, outer, -1, 1, cv2.FILLED)
+        sub = hole_fill[win]
+        sub[(solid > comp) & (sub_lab == 0) & (sub == 0)] = value
+    return hole_fill, sel
+
+
+def label_edges(labels):
+    """
+    ラベル画像の各成分の外側の境界画素 (4 近傍に別ラベルがある画素) を求める。
+
+    成分ごとの findContours/drawContours ではなく、ラベル画像に対する
+    十字カーネルの min/max フィルタ (erode/dilate) の差で全境界を一度に求める。
+    穴の縁は findContours(RETR_EXTERNAL) と同じく含めない (穴を埋めた画像で判定し直す)。
+    結果は採用/不採用に依存しないので、面積フィルタだけ変わったときに使い回せる。
+
+    Args:
+        labels: ラベル画像 (int32)
+
+    Returns:
+        (境界画素のフラットインデックス, その画素のラベル番号)
+    """
+    # float32 はラベル 2^24 未満まで正確。画像外は -1 として扱い、画像端も境界にする
+    # (findContours と同様)
+    lab_f = labels.astype(np.float32)
+    lo = cv2.erode(lab_f, _CROSS_KERNEL, borderType=cv2.BORDER_CONSTANT, borderValue=-1)
+    hi = cv2.dilate(lab_f, _CROSS_KERNEL, borderType=cv2.BORDER_CONSTANT, borderValue=-1)
+    edge_idx = np.flatnonzero(cv2.compare(lo, hi, cv2.CMP_NE))
+    edge_lab = labels.ravel()[edge_idx]
+    holes = _fill_label_holes(labels, edge_idx, edge_lab)
+    if holes is None:
+        return edge_idx, edge_lab
+    # 穴を埋めると境界でなくなり得るのは、穴を持つ成分の画素だけ。画像端の画素は
+    # 境界のまま。それ以外は、背景の近傍を穴の番号に置き換えても別ラベルが残るかを調べ直す
+    hole_fill, sel = holes
+    h, w = labels.shape[:2]
+    pos = np.flatnonzero(sel)
+    ys, xs = np.divmod(edge_idx[pos], w)
+    pos = pos[(ys > 0) & (ys < h - 1) & (xs > 0) & (xs < w - 1)]
+    p = edge_idx[pos]
+    v = edge_lab[pos]
+    flat_lab = labels.ravel()
+    flat_fill = hole_fill.ravel()
+    still = np.zeros(len(p), dtype=bool)
+    for q in (p - 1, p + 1, p - w, p + w):
+        nb = flat_lab[q]
+        still |= np.where(nb == 0, flat_fill[q], nb) != v
+    keep = np.ones(len(edge_idx), dtype=bool)
+    keep[pos[~still]] = False
+    return edge_idx[keep], edge_lab[keep]
+
+
+def label_boundary_mask(out, edge_idx, edge_lab, accepted_labels, num_labels):
+    """
+    採用したラベルの境界画素を out (uint8 マスク) に 255 で書き込む。
+
+    Args:
+        out: 書き込み先の uint8 マスク (H, W)
+        edge_idx, edge_lab: label_edges() の戻り値
+        accepted_labels: 境界を描くラベル番号の配列
+        num_labels: ラベル番号の上限 (最大ラベル + 1)
+
+    Returns:
+        out
+    """
+    boundary = out
+    if len(accepted_labels) == 0:
+        return boundary
+    accept = np.zeros(int(num_labels), dtype=bool)
+    accept[accepted_labels] = True
+    boundary.ravel()[edge_idx[accept[edge_lab]]] = 255
+    return boundary
 
 
 class CentroidProcessor:
@@ -23,6 +218,12 @@ class CentroidProcessor:
     パラメータに基づいて重心を計算する。
     """
 
+    # くびれ分割で 2x 縮小してコア検出する成分の最小面積 (proc ピクセル)
+    NECK_COARSE_MIN_AREA = 16384
+
+    # トリム用の矩形カーネル (半径 k -> (2k+1)x(2k+1)) のキャッシュ
+    _TRIM_KERNEL_CACHE = {}
+
     def __init__(self, proc_img, scale_proc_to_full, img_full):
         """
         初期化。
@@ -35,105 +236,348 @@ class CentroidProcessor:
         self.proc_img = proc_img
         self.scale_proc_to_full = scale_proc_to_full
         self.img_full = img_full
+        # 色グループ間で使い回す作業バッファ (スレッドプールで並列処理するのでスレッドごと)
+        self._buffers = threading.local()
+        # 面積フィルタ前の結果のキャッシュ (poster とトリム・分割パラメータがキー)
+        self._cache = {}
+
+    def _get_buffers(self, shape):
+        """
+        現在のスレッド用の作業バッファを返す (サイズが変わったときだけ再確保)。
+
+        Args:
+            shape: (H, W)
+
+        Returns:
+            mask / trim / comp (uint8) と labels (int32) を持つバッファ
+        """
+        buf = self._buffers
+        if getattr(buf, "shape", None) != tuple(shape):
+            buf.shape = tuple(shape)
+            buf.mask = np.empty(shape, dtype=np.uint8)
+            buf.trim = np.empty(shape, dtype=np.uint8)
+            buf.comp = np.empty(shape, dtype=np.uint8)
+            buf.labels = np.empty(shape, dtype=np.int32)
+        return buf
+
+    @classmethod
+    def _get_rect_kernel(cls, k):
+        """
+        3x3 矩形カーネルで k 回 erode するのと等価な (2k+1)x(2k+1) 矩形カーネルを返す。
+
+        Args:
+            k: 収縮量 (ピクセル)
+
+        Returns:
+            uint8 の構造要素 (k ごとにキャッシュ)
+        """
+        kernel = cls._TRIM_KERNEL_CACHE.get(k)
+        if kernel is None:
+            kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (2 * k + 1, 2 * k + 1))
+            cls._TRIM_KERNEL_CACHE[k] = kernel
+        return kernel
 
     def _split_by_neck_separation(self, comp_mask, neck_separation):
         """
         Detect and split particles by neck constriction using morphological operations.
-        Optimized with cv2.dilate for fast marker propagation.
+        Eroded cores are grown back over the component with cv2.watershed.
         
         Args:
             comp_mask: Binary mask of the component (0-255)
             neck_separation: Threshold for neck detection (0-10, 0=no splitting)
         
         Returns:
-            List of binary masks for split components
+            (split_masks, split_stats): list of binary masks for split components and,
+            when a split occurred, a matching list of (area, cx, cy) computed from the
+            watershed labels (None when the component was not split)
         """
         if neck_separation <= 0 or comp_mask is None or comp_mask.sum() == 0:
-            return [comp_mask]
+            return [comp_mask], None
         
         try:
             # Normalize neck_separation (0-10) to erosion strength
             # Higher value = more aggressive erosion to break necks
             erosion_strength = int(neck_separation)
             if erosion_strength <= 0:
-                return [comp_mask]
+                return [comp_mask], None
             
             # Apply erosion to thin out the component, revealing connection points
             kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3))
-            eroded = cv2.erode(comp_mask, kernel, iterations=erosion_strength)
-            
-            # Find connected components in eroded mask (these are the "cores")
-            num_cores, core_labels = cv2.connectedComponents(eroded, connectivity=4)[:2]
+            h, w = comp_mask.shape[:2]
+            if (erosion_strength % 2 == 0 and h >= 4 and w >= 4
+                    and cv2.countNonZero(comp_mask) > self.NECK_COARSE_MIN_AREA):
+                # Large blobs: find the cores on a 2x downsampled mask (4x fewer
+                # pixels, half the erosion) and upsample the core labels as seeds.
+                # 奇数の k は半分の回数に丸めると収縮が強くなり過ぎるので、偶数のときだけ
+                small = cv2.resize(comp_mask, (w // 2, h // 2), interpolation=cv2.INTER_AREA)
+                small = np.where(small >= 128, np.uint8(255), np.uint8(0))
+                eroded = cv2.erode(small, kernel, iterations=erosion_strength // 2)
+                num_cores, core_labels_small = connected_components(eroded, connectivity=4)[:2]
+                core_labels = cv2.resize(core_labels_small.astype(np.int32), (w, h), interpolation=cv2.INTER_NEAREST)
+                core_labels[comp_mask == 0] = 0
+            else:
+                eroded = cv2.erode(comp_mask, kernel, iterations=erosion_strength)
+                # Find connected components in eroded mask (these are the "cores")
+                num_cores, core_labels = connected_components(eroded, connectivity=4)[:2]
             
-            if DEBUG:
+            if __debug__ and DEBUG:
                 print(f"[DEBUG] _split_by_neck_separation: neck_sep={erosion_strength}, num_cores={num_cores}")
             
             # num_cores includes background (0), so we need at least 3 (bg + 2 actual cores)
             if num_cores < 3:
                 # 0 is background, only 1 or fewer actual cores -> no split needed
-                return [comp_mask]
+                return [comp_mask], None
             
             # Use multiple cores as seeds for splitting original component
-            # by fast marker propagation with cv2.dilate
-            markers = np.zeros(comp_mask.shape, dtype=np.int32)
-            for core_id in range(1, num_cores):
-                markers[core_labels == core_id] = core_id
-            
-            # Ensure background is marked as -1 to distinguish from unmarked
-            markers[comp_mask == 0] = -1
-            
-            # Fast marker propagation using dilate (OpenCV optimized)
-            kernel_dilate = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3))
-            for iteration in range(max(comp_mask.shape)):  # enough iterations to fill
-                markers_old = markers.copy()
-                # Dilate each marker separately to propagate without conflicts
-                for core_id in range(1, num_cores):
-                    core_marker = (markers == core_id).astype(np.uint8) * 255
-                    dilated = cv2.dilate(core_marker, kernel_dilate, iterations=1)
-                    # Only expand into unmarked pixels (markers == 0)
-                    expand_mask = (dilated > 0) & (markers == 0) & (comp_mask > 0)
-                    markers[expand_mask] = core_id
-                
-                # Check if all pixels are assigned
-                if np.array_equal(markers, markers_old):
-                    break
-            
-            # Extract split masks
+            # by a seeded watershed flood (single C++ pass).
+            # Pad by 1px because cv2.watershed marks the image border as -1.
+            fg = cv2.copyMakeBorder(comp_mask, 1, 1, 1, 1, cv2.BORDER_CONSTANT, value=0)
+            markers = cv2.copyMakeBorder(core_labels.astype(np.int32), 1, 1, 1, 1, cv2.BORDER_CONSTANT, value=0)
+            # Background stays unknown (0): its edge cost (255) is higher than the
+            # flat foreground (0), so it is flooded only after the component is filled.
+            cv2.watershed(cv2.cvtColor(fg, cv2.COLOR_GRAY2BGR), markers)
+
+            # Watershed lines (-1) between cores: give each one to the nearest
+            # labelled foreground pixel with a single distanceTransformWithLabels
+            # pass (nearest-seed Voronoi) instead of iterating neighbours.
+            line = (markers == -1) & (fg > 0)
+            if line.any():
+                seeded = (markers > 0) & (fg > 0)
+                seed = np.where(seeded, np.uint8(0), np.uint8(255))
+                _, nearest = cv2.distanceTransformWithLabels(seed, cv2.DIST_L2, 3, labelType=cv2.DIST_LABEL_PIXEL)
+                # map per-seed-pixel labels back to the core id at that seed pixel
+                lut = np.zeros(int(nearest.max()) + 1, dtype=np.int32)
+                lut[nearest[seeded]] = markers[seeded]
+                markers[line] = lut[nearest[line]]
+            markers = markers[1:-1, 1:-1]
+
+            # Extract split masks; area/centroid come straight from the labels
+            # (bincount over foreground pixels) so no second CCL pass is needed.
+            fg_y, fg_x = np.nonzero(comp_mask)
+            fg_lab = markers[fg_y, fg_x]
+            fg_lab = np.where(fg_lab > 0, fg_lab, 0)
+            counts = np.bincount(fg_lab, minlength=num_cores)
+            sum_x = np.bincount(fg_lab, weights=fg_x, minlength=num_cores)
+            sum_y = np.bincount(fg_lab, weights=fg_y, minlength=num_cores)
             split_masks = []
+            split_stats = []
             for core_id in range(1, num_cores):
+                area = int(counts[core_id])
+                if area <= 0:
+                    continue
                 split_mask = ((markers == core_id) & (comp_mask > 0)).astype(np.uint8) * 255
-                if split_mask.sum() > 0:
-                    split_masks.append(split_mask)
+                split_masks.append(split_mask)
+                split_stats.append((area, sum_x[core_id] / area, sum_y[core_id] / area))
             
-            if DEBUG and len(split_masks) > 1:
+            if __debug__ and DEBUG and len(split_masks) > 1:
                 print(f"[DEBUG] _split_by_neck_separation: split into {len(split_masks)} masks")
             
             if split_masks:
-                return split_masks
+                return split_masks, split_stats
             else:
-                return [comp_mask]
+                return [comp_mask], None
         except Exception as e:
-            if DEBUG:
+            if __debug__ and DEBUG:
                 print(f"[DEBUG] _split_by_neck_separation failed: {e}")
-            return [comp_mask]
+            return [comp_mask], None
+
+    def _label_group(self, group_no, label_img, trim_px_proc, neck_separation, min_split_area):
+        """
+        1 つの色グループについてトリム・連結成分解析・くびれ分割を行い、
+        面積フィルタ前の候補 (成分または分割片) を返す。
+
+        Args:
+            group_no: 色グループ番号 (1 始まり, label_img の値 + 1)
+            label_img: 色グループのラベル画像 (int32)
+            trim_px_proc: proc 解像度でのトリム量
+            neck_separation: くびれ分割の強さ
+            min_split_area: この面積未満で画像の端に接していない成分はくびれ分割しない
+
+        Returns:
+            dict: labels (候補のラベル番号), areas (面積), xy (重心 (N, 2)),
+            edge_idx / edge_lab (label_edges の結果), num_labels (ラベル番号の上限)
+        """
+        if __debug__ and DEBUG and group_no % 5 == 0:
+            print(f"[DEBUG][CentroidProcessor] processing color group {group_no}")
+        buf = self._get_buffers(label_img.shape[:2])
+        mask = cv2.compare(label_img, group_no - 1, cv2.CMP_EQ, dst=buf.mask)
+        # トリム（収縮）: UIで指定されたフル画像ピクセル単位を proc 解像度へ変換した
+        # `trim_px_proc` だけ形態学的収縮を行う。3x3 矩形で k 回 erode するのと
+        # 等価な (2k+1)x(2k+1) 矩形カーネルで 1 回だけ erode する。
+        if trim_px_proc > 0:
+            mask = cv2.erode(mask, self._get_rect_kernel(int(trim_px_proc)), dst=buf.trim)
+        
+        # Simple connected components analysis (4-connectivity)
+        num_labels, labels, stats, centroids = connected_components_with_stats(mask, connectivity=4, labels=buf.labels)
+
+        if neck_separation <= 0:
+            # 分割なし: 候補は全成分 (stats をそのまま使う)
+            edge_idx, edge_lab = label_edges(labels)
+            return {
+                "labels": np.arange(1, num_labels, dtype=np.int32),
+                "areas": stats[1:, cv2.CC_STAT_AREA].copy(),
+                "xy": centroids[1:].copy(),
+                "edge_idx": edge_idx,
+                "edge_lab": edge_lab,
+                "num_labels": num_labels,
+            }
 
-    def get_centroids(self, params, poster=None):
+        # 分割された成分は分割片ごとに新しいラベル番号を振り直す。
+        # 候補は Python のリストを積まずに事前確保した配列へ書き込む
+        # (分割で成分数を超えた場合だけ倍に拡張する)
+        next_label = num_labels
+        cap = max(1, num_labels - 1)
+        cand_labels = np.empty(cap, dtype=np.int32)
+        cand_areas = np.empty(cap, dtype=np.int64)
+        cand_xy = np.empty((cap, 2), dtype=np.float64)
+        n = 0
+        img_h, img_w = labels.shape[:2]
+        for lab in range(1, num_labels):
+            area = int(stats[lab, cv2.CC_STAT_AREA])
+            x, y, bw, bh = (int(v) for v in stats[lab, :4])
+
+            # Optional neck separation: detect and split pinched particles
+            # (erode は画像の外を前景として扱うので、端に接する成分には面積の下限が当てはまらない)
+            if area < min_split_area and x > 0 and y > 0 and x + bw < img_w and y + bh < img_h:
+                split_masks, split_stats = [], None
+            else:
+                comp_mask = cv2.compare(labels, lab, cv2.CMP_EQ, dst=buf.comp)
+                split_masks, split_stats = self._split_by_neck_separation(comp_mask, neck_separation)
+
+            # If no split occurred (or single piece), use original area
+            if len(split_masks) <= 1:
+                pieces = [(lab, area, centroids[lab])]
+            else:
+                # only split areas counted
+                pieces = []
+                for split_mask, (split_area, cx, cy) in zip(split_masks, split_stats):
+                    labels[split_mask > 0] = next_label
+                    pieces.append((next_label, split_area, (cx, cy)))
+                    next_label += 1
+            for piece_label, piece_area, piece_xy in pieces:
+                if n >= len(cand_labels):
+                    cand_labels = np.concatenate([cand_labels, np.empty_like(cand_labels)])
+                    cand_areas = np.concatenate([cand_areas, np.empty_like(cand_areas)])
+                    cand_xy = np.concatenate([cand_xy, np.empty_like(cand_xy)])
+                cand_labels[n] = piece_label
+                cand_areas[n] = piece_area
+                cand_xy[n] = piece_xy
+                n += 1
+        edge_idx, edge_lab = label_edges(labels)
+        return {
+            "labels": cand_labels[:n],
+            "areas": cand_areas[:n],
+            "xy": cand_xy[:n],
+            "edge_idx": edge_idx,
+            "edge_lab": edge_lab,
+            "num_labels": next_label,
+        }
+
+    @staticmethod
+    def _filter_group(group, min_area, max_area, boundary_mask):
+        """
+        _label_group の候補に面積フィルタを掛ける (ベクトル演算)。
+
+        Args:
+            group: _label_group の戻り値
+            min_area: 最小面積
+            max_area: 最大面積 (None なら上限なし)
+            boundary_mask: 採用した候補の境界を書き込む uint8 マスク
+
+        Returns:
+            (重心配列 float64 (N, 2) [[cx, cy], ...], フィルタ前の面積リスト)
+        """
+        comp_areas = group["areas"]
+        keep = comp_areas >= min_area
+        if max_area is not None:
+            try:
+                keep &= comp_areas <= int(max_area)
+            except Exception:
+                pass
+        areas = comp_areas[comp_areas > 0].tolist()
+        label_boundary_mask(boundary_mask, group["edge_idx"], group["edge_lab"],
+                            group["labels"][keep], group["num_labels"])
+        return group["xy"][keep], areas
+
+    def _label_groups(self, poster, palette, trim_px_proc, neck_separation, min_split_area, labels=None):
+        """
+        poster を色グループに分け、グループごとに _label_group を実行する。
+
+        Args:
+            poster: ポスタライズ画像
+            palette: poster の代表色 (None なら np.unique で求める)
+            trim_px_proc: proc 解像度でのトリム量
+            neck_separation: くびれ分割の強さ
+            min_split_area: この面積未満で画像の端に接していない成分はくびれ分割しない
+            labels: poster の各画素の palette 番号 (H, W) (None なら poster の色から求める)
+
+        Returns:
+            グループ番号順の _label_group の結果のリスト
+        """
+        # 3ch の poster を 1 回だけ走査して単一チャネルのラベル画像にする
+        # (色ごとに cv2.inRange で全画素を K 回走査しない)
+        h, w = poster.shape[:2]
+        if palette is not None:
+            # codebook (K 色) だけをソート・重複除去し、画素は二分探索で番号付けする
+            # (全画素のソートを避ける。グループ番号の順序は np.unique と同じ)
+            pal = np.asarray(palette, dtype=np.uint8).reshape(-1, 3)
+            pal_packed = (pal[:, 0].astype(np.uint32) << 16) | (pal[:, 1].astype(np.uint32) << 8) | pal[:, 2]
+            uniq_packed = np.unique(pal_packed)
+            if labels is not None and np.size(labels) == h * w:
+                # K-means のクラスタ番号があれば、K 要素の表 (palette 番号 -> グループ番号) を引くだけ
+                # (poster の画素を詰め直して二分探索しない)
+                lut = np.searchsorted(uniq_packed, pal_packed).astype(np.int32)
+                inverse = lut[np.asarray(labels).ravel()]
+            else:
+                packed = (poster[..., 0].astype(np.uint32) << 16) | (poster[..., 1].astype(np.uint32) << 8) | poster[..., 2]
+                inverse = np.searchsorted(uniq_packed, packed.ravel())
+            used = np.bincount(inverse, minlength=len(uniq_packed)) > 0
+            if not used.all():
+                # 空クラスタの色は詰める (np.unique と同じグループ番号にする)
+                remap = np.cumsum(used) - 1
+                inverse = remap[inverse]
+                uniq_packed = uniq_packed[used]
+        else:
+            packed = (poster[..., 0].astype(np.uint32) << 16) | (poster[..., 1].astype(np.uint32) << 8) | poster[..., 2]
+            uniq_packed, inverse = np.unique(packed.ravel(), return_inverse=True)
+        label_img = inverse.reshape(h, w).astype(np.int32, copy=False)
+        unique_colors = np.stack([(uniq_packed >> 16) & 0xFF, (uniq_packed >> 8) & 0xFF, uniq_packed & 0xFF], axis=1).astype(np.uint8)
+        # 色グループ同士は独立で、処理の大半は GIL を解放する OpenCV 呼び出しなので
+        # スレッドプールで並列に処理し、結果はグループ順に連結する。
+        # 並列数は OpenCV 内部のスレッド数と掛けてコア数程度になる GROUP_WORKERS まで。
+        group_args = [(group_no, label_img, trim_px_proc, neck_separation, min_split_area)
+                      for group_no in range(1, len(unique_colors) + 1)]
+        workers = min(len(group_args), GROUP_WORKERS)
+        if workers > 1:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                return list(pool.map(lambda a: self._label_group(*a), group_args))
+        return [self._label_group(*a) for a in group_args]
+
+    def invalidate(self):
+        """面積フィルタ前の結果のキャッシュを破棄する。"""
+        self._cache = {}
+
+    def get_centroids(self, params, poster=None, palette=None, labels=None):
         """
         重心を計算する。
 
         Args:
             params: 処理パラメータ (levels, min_area, trim_px)
             poster: ポスタライズ画像 (Noneなら内部生成)
+            palette: poster の代表色 (K, 3) uint8 (kmeans_posterize の codebook)。
+                渡されれば poster 全体に対する np.unique を省略する
+            labels: poster の各画素の palette 番号 (kmeans_posterize の return_labels)。
+                palette と一緒に渡されれば色からの番号付けを省略する
 
         Returns:
             重心リスト [[group_no, cx, cy], ...]
         """
         # posterが渡されなければここで生成（後方互換）
         start_t = time.time()
-        if DEBUG:
+        if __debug__ and DEBUG:
             print(f"[DEBUG][CentroidProcessor] get_centroids start levels={params.get('levels')} min_area={params.get('min_area')} trim={params.get('trim_px')}")
         if poster is None:
-            poster = kmeans_posterize(self.proc_img, params["levels"])
+            poster, palette, labels = kmeans_posterize(self.proc_img, params["levels"], return_labels=True)
         min_area = params["min_area"]
         max_area = params.get("max_area", None)
         neck_separation = int(params.get("neck_separation", 0) or 0)
@@ -145,83 +589,39 @@ class CentroidProcessor:
             trim_px_proc = int(round(float(trim_px_full) / max(1.0, float(self.scale_proc_to_full))))
         except Exception:
             trim_px_proc = int(trim_px_full)
-        unique_colors = np.unique(poster.reshape(-1, 3), axis=0)
-        results = []
+        # くびれ分割の省略条件 (_label_group 参照)。画像の端に接しない成分で、
+        # k 回の収縮でコアが 2 つ残り得る最小面積
+        k = int(neck_separation)
+        min_split_area = 2 * k * k + 2 * k + 2 if k > 0 else 0
+        # 面積フィルタ前までの結果は poster とトリム・分割パラメータだけで決まるので、
+        # min_area/max_area だけが変わったときはキャッシュした候補に再フィルタするだけにする
+        cache_key = (trim_px_proc, neck_separation)
+        cache = self._cache
+        if cache.get("poster") is poster and cache.get("key") == cache_key:
+            groups_cand = cache["groups"]
+        else:
+            groups_cand = self._label_groups(poster, palette, trim_px_proc, neck_separation, min_split_area, labels)
+            # poster への参照も保持する (id の再利用による誤ヒットを防ぐ)
+            self._cache = {"poster": poster, "key": cache_key, "groups": groups_cand}
+
         # For histogram: store component areas BEFORE applying min/max filters.
         self.last_component_areas = []
         # For boundary display: mask AFTER applying min/max filters (and trim).
         self.last_boundary_mask = np.zeros(poster.shape[:2], dtype=np.uint8)
+        group_results = [self._filter_group(g, min_area, max_area, self.last_boundary_mask) for g in groups_cand]
 
-        for group_no, color in enumerate(unique_colors, 1):
-            if DEBUG and group_no % 5 == 0:
-                print(f"[DEBUG][CentroidProcessor] processing color group {group_no}/{len(unique_colors)}")
-            mask = cv2.inRange(poster, color, color)
-            # トリム（収縮）: UIで指定されたフル画像ピクセル単位を proc 解像度へ変換した
-            # `trim_px_proc` を iterations に使って形態学的収縮を行う。
-            if trim_px_proc > 0:
-                k = int(trim_px_proc)
-                kernel = np.ones((3, 3), np.uint8)
-                mask = cv2.erode(mask, kernel, iterations=k)
-            
-            # Simple connected components analysis (4-connectivity)
-            num_labels, labels, stats, centroids = cv2.connectedComponentsWithStats(mask, connectivity=4)
-            for lab in range(1, num_labels):
-                area = int(stats[lab, cv2.CC_STAT_AREA])
-
-                # Optional neck separation: detect and split pinched particles
-                comp_mask = (labels == lab).astype(np.uint8) * 255
-                split_masks = self._split_by_neck_separation(comp_mask, neck_separation)
-
-                # If no split occurred (or single piece), use original area
-                if len(split_masks) <= 1:
-                    if area > 0:
-                        self.last_component_areas.append(area)
-                    if area < min_area:
-                        continue
-                    if max_area is not None:
-                        try:
-                            if area > int(max_area):
-                                continue
-                        except Exception:
-                            pass
-                    cx, cy = centroids[lab]
-                    results.append([group_no, cx, cy])
-                    try:
-                        contours, _ = cv2.findContours(comp_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-                        if contours:
-                            cv2.drawContours(self.last_boundary_mask, contours, -1, 255, 1)
-                    except Exception:
-                        pass
-                    continue
-
-                # Process each split component (only split areas counted)
-                for split_mask in split_masks:
-                    # Re-calculate centroid for this component
-                    split_num_labels, split_labels, split_stats, split_centroids = cv2.connectedComponentsWithStats(split_mask, connectivity=4)
-                    # Add all non-background components from this split
-                    for split_lab in range(1, int(split_num_labels)):
-                        split_area = int(split_stats[split_lab, cv2.CC_STAT_AREA])
-                        if split_area > 0:
-                            self.last_component_areas.append(split_area)
-                        if split_area < min_area:
-                            continue
-                        if max_area is not None:
-                            try:
-                                if split_area > int(max_area):
-                                    continue
-                            except Exception:
-                                pass
-                        cx, cy = split_centroids[split_lab]
-                        results.append([group_no, cx, cy])
-                        try:
-                            comp_split = (split_labels == split_lab).astype(np.uint8) * 255
-                            contours, _ = cv2.findContours(comp_split, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-                            if contours:
-                                cv2.drawContours(self.last_boundary_mask, contours, -1, 255, 1)
-                        except Exception as e:
-                            if DEBUG:
-                                print(f"[DEBUG] Failed to draw contours for split mask: {e}")
-                            pass
-        if DEBUG:
+        # 全グループ分の group_no / 重心を配列へ一括コピーし、最後に一度だけリスト化する
+        total = sum(len(r[0]) for r in group_results)
+        groups = np.empty(total, dtype=np.int32)
+        xy = np.empty((total, 2), dtype=np.float64)
+        off = 0
+        for group_no, (group_xy, group_areas) in enumerate(group_results, 1):
+            n = len(group_xy)
+            groups[off:off + n] = group_no
+            xy[off:off + n] = group_xy
+            off += n
+            self.last_component_areas.extend(group_areas)
+        results = [[g, x, y] for g, (x, y) in zip(groups.tolist(), xy.tolist())]
+        if __debug__ and DEBUG:
             print(f"[DEBUG][CentroidProcessor] get_centroids done: found {len(results)} centroids in {time.time()-start_t:.2f}s")
         return results
\ No newline at end of file
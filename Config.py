@@ -4,12 +4,17 @@
 処理パラメータやファイルパスの管理を行う。
 """
 
+import os
+
 # 設定や定数を記述
 PROC_TARGET_WIDTH = 640  # 処理用画像の目標幅 (ピクセル)
 
 # 最後に開いた画像ファイルのパス
 LAST_IMAGE_PATH_FILE = "last_image_path.txt"
 
+# 縮小済みロゴなど、起動をまたいで使い回すファイルの置き場
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".pixy", "cache")
+
 
 def save_last_image_path(path):
     """
@@ -49,6 +49,16 @@ def _ensure_ppm(path: str, color=(80, 80, 200), w=256, h=128):
 
 
 if __name__ == "__main__":
+    # ウィジェットは重ならないレイアウトなので、再描画ごとの subtractOpaqueSiblings
+    # (兄弟ウィジェットとの不透明領域の差し引き) は効果が無く負荷だけになる。
+    # QApplication 生成前に無効化しておく (PIXY_DISABLE_OPAQUE_SUBTRACT=0 で従来動作)
+    if os.environ.get("PIXY_DISABLE_OPAQUE_SUBTRACT", "1") != "0":
+        os.environ.setdefault("QT_NO_SUBTRACTOPAQUESIBLINGS", "1")
+    # マウス移動・ホイールなど高頻度イベントをまとめて配送させる (プラットフォームの既定に依存しない)
+    try:
+        QApplication.setAttribute(Qt.AA_CompressHighFrequencyEvents, True)
+    except Exception:
+        pass
     app = QApplication(sys.argv)
     # Diagnostic handler: if Qt emits the commitData warning, print a stack so we can find the origin
     try:
@@ -21,31 +21,62 @@ import qt_compat
 from qt_compat.QtWidgets import (
     QSlider, QMainWindow, QLabel, QVBoxLayout, QHBoxLayout, QPushButton, QLineEdit, QWidget,
     QFileDialog, QStyle, QSizePolicy, QTableWidget, QTableWidgetItem, QAbstractItemView,
-    QHeaderView, QScrollArea, QApplication, QMenu, QComboBox
+    QHeaderView, QScrollArea, QApplication, QMenu, QComboBox, QAbstractItemDelegate
 )
 from qt_compat.QtWidgets import QButtonGroup
-from qt_compat.QtCore import Qt, QTimer, QObject, QEvent, QRect, QPoint, pyqtSignal, QThread
-from qt_compat.QtGui import QPixmap, QFont, QCursor, QPainter, QPen, QColor, QPalette
+from qt_compat.QtCore import Qt, QTimer, QObject, QEvent, QRect, QPoint, pyqtSignal, pyqtSlot, QCoreApplication
+from qt_compat.QtGui import QPixmap, QFont, QCursor, QPainter, QPainterPath, QPen, QColor, QPalette, QBrush, QStaticText
 
-from Util import cvimg_to_qpixmap, kmeans_posterize
+from Util import cvimg_to_qpixmap, kmeans_posterize, imread_color, load_scaled_pixmap_cached
 from CalcCentroid import CentroidProcessor
 from Config import PROC_TARGET_WIDTH, save_last_image_path, load_last_image_path, DEBUG
 
 import numpy as np
 import cv2
+import heapq
 from datetime import datetime
-from collections import deque
-from time import monotonic
-from widgets import ClickableSlider, RefTableDelegate
-from rendering import build_zoomed_canvas, draw_crosshair
-from tables import populate_tables, fix_tables_height
+from widgets import ClickableSlider, RefTableDelegate, CrosshairLabel
+from rendering import build_zoomed_canvas, blend_edges_white, color_boundary_mask, trim_color_regions
+from tables import populate_tables, fix_tables_height, tables_height_key
 from interactions import ImageViewController
 import unicodedata
 import Strings as STR
 import os
 import math
-import ctypes
-from ctypes import wintypes
+import threading
+from functools import lru_cache
+
+# よく使う配置フラグの組み合わせ (描画やセル生成のたびに | を計算しない)
+ALIGN_HVCENTER = Qt.AlignHCenter | Qt.AlignVCenter
+ALIGN_LEFT_VCENTER = Qt.AlignLeft | Qt.AlignVCenter
+ALIGN_RIGHT_VCENTER = Qt.AlignRight | Qt.AlignVCenter
+ALIGN_LEFT_TOP = Qt.AlignLeft | Qt.AlignTop
+
+# スライダー行の +/- ボタン (objectName "nudge") 用。親ウィジェットに一度だけ設定する
+NUDGE_BUTTON_QSS = "QPushButton#nudge { padding:0px; margin:0px; }"
+
+# 転置表示の列幅 (px)。table_between の列は table_ref_view に揃え、それを超える分は BETWEEN_EXTRA_COLUMN_WIDTH
+REF_VIEW_COLUMN_WIDTH = 50
+BETWEEN_EXTRA_COLUMN_WIDTH = 40
+
+# 画像読み込み時にバックグラウンドで先に計算しておく K の範囲 (現在の K ± この値)
+POSTER_PRECOMPUTE_RADIUS = 3
+
+
+@lru_cache(maxsize=512)
+def _nfkc_cached(text):
+    return unicodedata.normalize('NFKC', text)
+
+
+def _nfkc(text):
+    """表のセル入力を NFKC で半角に正規化する。
+
+    座標入力はほぼ ASCII (NFKC では変わらない) なのでそのまま返し、
+    全角入力は同じ文字列が繰り返されやすいのでキャッシュする。
+    """
+    if text.isascii():
+        return text
+    return _nfkc_cached(text)
 
 
 class SegmentControl(QWidget):
@@ -193,11 +224,45 @@ class AreaHistogramWidget(QWidget):
         self._dragging = None  # 'min'|'max'|None
         self._user_set_selection = False
         self._autoset_done = False
+        # 軸ラベル用の太字フォント (paintEvent ごとに作らない。フォント変更時に作り直す)
+        self._bold_font = None
+        # Min/Max・目盛りラベルの QStaticText (テキストごとにレイアウトを保持。フォント変更時に破棄)
+        self._static_texts = {}
         try:
             self.setMinimumHeight(180)
         except Exception:
             pass
 
+    def _get_bold_font(self):
+        if self._bold_font is None:
+            f = QFont(self.font())
+            f.setBold(True)
+            self._bold_font = f
+        return self._bold_font
+
+    def _draw_static_text(self, painter, x, y, text):
+        """
+        drawText(x, y, text) と同じ位置 (y はベースライン) に、キャッシュした QStaticText で描く。
+
+        ドラッグ中は paintEvent が毎回走るので、同じ文字列のレイアウトを作り直さない。
+        """
+        st = self._static_texts.get(text)
+        if st is None:
+            st = QStaticText(text)
+            st.setTextFormat(Qt.PlainText)
+            st.prepare(font=painter.font())
+            self._static_texts[text] = st
+        painter.drawStaticText(QPoint(int(x), int(y) - painter.fontMetrics().ascent()), st)
+
+    def changeEvent(self, event):
+        try:
+            if event.type() == QEvent.FontChange:
+                self._bold_font = None
+                self._static_texts = {}
+        except Exception:
+            pass
+        super().changeEvent(event)
+
     def set_data(self, bins, vals, counts=None):
         self._bins = bins
         self._vals = vals
@@ -386,7 +451,6 @@ class AreaHistogramWidget(QWidget):
         self._dragging = None
 
     def paintEvent(self, event):
-        from qt_compat.QtGui import QPainterPath
         painter = QPainter(self)
         painter.setRenderHint(QPainter.Antialiasing, True)
         w = self.width(); h = self.height()
@@ -427,7 +491,7 @@ class AreaHistogramWidget(QWidget):
             painter.setPen(QPen(QColor("#000")))
             painter.setFont(self.font())
             # Align title with other left-column labels (e.g., 'Number of Groups').
-            painter.drawText(QRect(0, 0, max(10, w), max(10, margin_t - 6)), Qt.AlignLeft | Qt.AlignVCenter, "Grain Size Threshold (pix)")
+            painter.drawText(QRect(0, 0, max(10, w), max(10, margin_t - 6)), ALIGN_LEFT_VCENTER, "Grain Size Threshold (pix)")
         except Exception:
             pass
 
@@ -557,8 +621,8 @@ class AreaHistogramWidget(QWidget):
                 painter.drawLine(int(xmx), margin_t, int(xmx), y0)
                 # small labels
                 painter.setPen(QPen(QColor("#666")))
-                painter.drawText(int(xmn) - 12, margin_t + 12, "Min")
-                painter.drawText(int(xmx) - 12, margin_t + 12, "Max")
+                self._draw_static_text(painter, int(xmn) - 12, margin_t + 12, "Min")
+                self._draw_static_text(painter, int(xmx) - 12, margin_t + 12, "Max")
         except Exception:
             pass
 
@@ -589,40 +653,30 @@ class AreaHistogramWidget(QWidget):
                     label_text = f"{int(xl)}"
                 else:
                     label_text = f"{xl:.1f}"
-                painter.drawText(int(px - 10), y0 + 18, label_text)
+                self._draw_static_text(painter, int(px - 10), y0 + 18, label_text)
             
             # Y-axis numeric labels are intentionally omitted.
 
             # Axis labels: left=count (gray), right=area (red)
             try:
                 painter.setPen(QPen(QColor("#888")))
-                f = QFont(self.font());
-                try:
-                    f.setBold(True)
-                except Exception:
-                    pass
                 painter.save()
-                painter.setFont(f)
+                painter.setFont(self._get_bold_font())
                 # Move slightly right to avoid hugging the edge
                 painter.translate(22, margin_t + rect_h / 2.0)
                 painter.rotate(-90)
-                painter.drawText(QRect(-rect_h // 2, -10, rect_h, 20), Qt.AlignHCenter | Qt.AlignVCenter, "Grain No.")
+                painter.drawText(QRect(-rect_h // 2, -10, rect_h, 20), ALIGN_HVCENTER, "Grain No.")
                 painter.restore()
             except Exception:
                 pass
             try:
                 painter.setPen(QPen(QColor("#bb2a2a")))
-                f = QFont(self.font());
-                try:
-                    f.setBold(True)
-                except Exception:
-                    pass
                 painter.save()
-                painter.setFont(f)
+                painter.setFont(self._get_bold_font())
                 painter.translate(x0 + rect_w + 14, margin_t + rect_h / 2.0)
                 # Flip reading direction (180° from previous): use +90 instead of -90
                 painter.rotate(90)
-                painter.drawText(QRect(-rect_h // 2, -10, rect_h, 20), Qt.AlignHCenter | Qt.AlignVCenter, "Area")
+                painter.drawText(QRect(-rect_h // 2, -10, rect_h, 20), ALIGN_HVCENTER, "Area")
                 painter.restore()
             except Exception:
                 pass
@@ -630,11 +684,10 @@ class AreaHistogramWidget(QWidget):
             # X-axis label: bold, same color as tick labels.
             painter.setPen(QPen(tick_color))
             try:
-                fx = QFont(self.font()); fx.setBold(True)
-                painter.setFont(fx)
+                painter.setFont(self._get_bold_font())
             except Exception:
                 pass
-            painter.drawText(QRect(x0, y0 + 26, rect_w, 20), Qt.AlignHCenter | Qt.AlignVCenter, "Area (pix)")
+            painter.drawText(QRect(x0, y0 + 26, rect_w, 20), ALIGN_HVCENTER, "Area (pix)")
         except Exception:
             pass
 
@@ -645,6 +698,10 @@ class TitleBar(QWidget):
         self._parent = parent
         self.setFixedHeight(36)
         self.setObjectName('titleBar')
+        # paintEvent で毎回 QColor を作らないようブラシを保持する
+        self._bg_brush = QBrush(QColor(160, 15, 15))
+        # 全面を自前で塗るので親の背景の描画は不要
+        self.setAttribute(Qt.WA_OpaquePaintEvent, True)
         # ensure solid background using palette (avoid stylesheet inheritance issues)
         try:
             self.setAutoFillBackground(True)
@@ -659,7 +716,7 @@ class TitleBar(QWidget):
         hl.setSpacing(0)
         self.label = QLabel(STR.APP_TITLE)
         self.label.setStyleSheet('color: white; font-weight: bold; font-family: "Segoe UI", sans-serif; font-size: 13px;')
-        self.label.setAlignment(Qt.AlignVCenter | Qt.AlignLeft)
+        self.label.setAlignment(ALIGN_LEFT_VCENTER)
         self.label.setContentsMargins(0, 0, 0, 0)
         hl.addWidget(self.label)
         hl.addStretch(1)
@@ -777,12 +834,7 @@ class TitleBar(QWidget):
     def paintEvent(self, event):
         # Ensure title bar background is painted solid (avoid stylesheet inheritance issues)
         painter = QPainter(self)
-        painter.fillRect(self.rect(), QColor(160, 15, 15))
-
-    def paintEvent(self, event):
-        """Force paint background to ensure color is applied."""
-        painter = QPainter(self)
-        painter.fillRect(self.rect(), QColor(160, 15, 15))
+        painter.fillRect(event.rect(), self._bg_brush)
 
 
 class Footer(QWidget):
@@ -790,6 +842,8 @@ class Footer(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setFixedHeight(20)
+        self._bg_brush = QBrush(QColor(0, 0, 0))
+        self.setAttribute(Qt.WA_OpaquePaintEvent, True)
         self.setAutoFillBackground(True)
         pal = self.palette()
         pal.setColor(QPalette.Window, QColor(0, 0, 0))
@@ -805,7 +859,7 @@ class Footer(QWidget):
     def paintEvent(self, event):
         """Force paint background to ensure color is applied."""
         painter = QPainter(self)
-        painter.fillRect(self.rect(), QColor(0, 0, 0))
+        painter.fillRect(event.rect(), self._bg_brush)
         
     def showMessage(self, msg):
         self.label.setText(msg)
@@ -857,6 +911,9 @@ class CentroidFinderWindow(QMainWindow):
     参照点設定、フィッティング、テーブル表示を統合。
     """
 
+    # ワーカースレッドの K-means が終わった (引数はそのときの proc_img)。GUI スレッドへキュー接続で届く
+    _posterReady = pyqtSignal(object)
+
     def __init__(self):
         super().__init__()
         # ウィンドウタイトル設定
@@ -890,6 +947,7 @@ class CentroidFinderWindow(QMainWindow):
         self.ref_points = [None] * 10  # 参照点リスト [(x_proc, y_proc) or None]
         self.ref_selected_index = 0     # 選択中の参照点インデックス
         self.ref_obs = [{"x": "", "y": "", "z": ""} for _ in range(10)]  # 参照点の観測値
+        self._ref_free = list(range(len(self.ref_points)))  # 空き Ref 列の候補 (最小ヒープ)
 
         # UI 状態
         self.visible_ref_cols = 3      # 表示する参照点列数
@@ -928,13 +986,6 @@ class CentroidFinderWindow(QMainWindow):
         self._dragging = False
         self._drag_start_vp = None
         self._drag_start_scroll = (0, 0)
-        self._drag_recent = deque(maxlen=8)  # 最近のドラッグ位置
-        self._kinetic_timer = QTimer(self)
-        self._kinetic_timer.setInterval(16)
-        self._kinetic_timer.timeout.connect(self._on_kinetic_tick)
-        self._kinetic_vx = 0.0  # 慣性速度 X
-        self._kinetic_vy = 0.0  # 慣性速度 Y
-        self._kinetic_last_t = 0.0
 
         # キャッシュ: パラメータ変更時の再計算を避ける
         self._cache = {
@@ -943,6 +994,8 @@ class CentroidFinderWindow(QMainWindow):
             "min_area": None,    # Min Area
             "trim_px": None,     # Trim (pix)
             "poster": None,      # ポスタライズ画像
+            "palette": None,     # ポスタライズの代表色 (K-means codebook)
+            "labels": None,      # poster の各画素の palette 番号
             "centroids": None,   # 重心リスト
         }
 
@@ -950,22 +1003,51 @@ class CentroidFinderWindow(QMainWindow):
         self.update_timer = QTimer(self)
         self.update_timer.setSingleShot(True)
         self.update_timer.setInterval(35)  # 35ms 遅延
-        self.update_timer.timeout.connect(self._update_image_actual)
+        self.update_timer.timeout.connect(self._on_update_timer)
+        self._posterReady.connect(self._on_poster_ready)
+        # K-means ワーカースレッド (終了時に止めて待つ。実行中のまま終了すると C++ 側で落ちる)
+        self._poster_stop = threading.Event()
+        self._poster_threads = []
+        app = QCoreApplication.instance()
+        if app is not None:
+            # app.quit() で終わる場合は closeEvent が来ないのでここでも止める
+            app.aboutToQuit.connect(self._stop_poster_workers)
+        # 転置表の Ref 編集後の表再構築 (_defer_recompute_after_ref_edit で再始動する)
+        self._ref_recompute_timer = QTimer(self)
+        self._ref_recompute_timer.setSingleShot(True)
+        self._ref_recompute_timer.setInterval(150)
+        self._ref_recompute_timer.timeout.connect(self._run_deferred_ref_recompute)
+        self._ref_recompute_dirty = False  # Obs. が実際に変わった編集があったか
         self._painting = False  # 描画中フラグ
+        # 転置ビューを最後に作り直したときの元データ (None なら次の _refresh_transposed_views で必ず作り直す)
+        self._transposed_key = None
+
+        # コントロール用フォント (Segoe UI 12、アプリ共通)。各行・各ラベルで作り直さず使い回す
+        try:
+            self._ctrl_font = QFont('Segoe UI', 12)
+            self._ctrl_font.setBold(False)
+        except Exception:
+            self._ctrl_font = QFont()
+        self._ctrl_font_bold = QFont(self._ctrl_font)
+        self._ctrl_font_bold.setBold(True)
 
         # 自動デバッグ: 初回更新後に自動終了するかどうか
         self._auto_exit_after_update = False
 
         # 画像表示ラベル (中央揃え)
-        self.img_label_proc = QLabel(alignment=Qt.AlignCenter)
+        self.img_label_proc = CrosshairLabel(alignment=Qt.AlignCenter)
         self.img_label_proc.setMouseTracking(True)  # マウス追跡有効
+        # 不透明なウィジェットにしておくと、スクロールでラベルが動くとき Qt が
+        # 描画済みの内容をそのまま移動 (blit) し、新しく見えた帯だけを描き直す
+        # (慣性スクロールのティックごとに見えている画像全体を描き直さない)
+        self.img_label_proc.setAutoFillBackground(True)
 
         # 画像用スクロールエリア (ズーム/パン対応)
         self.proc_scroll = QScrollArea()
         self.proc_scroll.setWidgetResizable(False)
         # Use top-left alignment so label coordinates map directly to scroll values.
         # Centering the widget inside the viewport caused mapping offsets when zooming.
-        self.proc_scroll.setAlignment(Qt.AlignLeft | Qt.AlignTop)
+        self.proc_scroll.setAlignment(ALIGN_LEFT_TOP)
         self.proc_scroll.setWidget(self.img_label_proc)
         self.proc_scroll.viewport().setMouseTracking(True)
 
@@ -973,17 +1055,6 @@ class CentroidFinderWindow(QMainWindow):
         # マウス/キーボード操作コントローラ
         self.interactions = ImageViewController(self)
 
-        # Ensure patch worker threads are cleaned up on app exit
-        try:
-            app = QApplication.instance()
-            if app is not None:
-                try:
-                    app.aboutToQuit.connect(self._cleanup_threads)
-                except Exception:
-                    pass
-        except Exception:
-            pass
-
         # 参照点テーブル (左側: 最大10列、表示列は可変)
         self.table_ref = QTableWidget(0, 10)  # 行0、列10 (内部容量)
         # 重心テーブル (右側: 列数は動的)
@@ -1006,7 +1077,7 @@ class CentroidFinderWindow(QMainWindow):
         vf.setBold(True)
         self.table_ref.verticalHeader().setFont(vf)
         try:
-            self.table_ref.verticalHeader().setDefaultAlignment(Qt.AlignRight | Qt.AlignVCenter)
+            self.table_ref.verticalHeader().setDefaultAlignment(ALIGN_RIGHT_VCENTER)
         except Exception:
             pass  # 互換性確保
 
@@ -1016,7 +1087,7 @@ class CentroidFinderWindow(QMainWindow):
         vf2.setBold(True)
         self.table.verticalHeader().setFont(vf2)
         try:
-            self.table.verticalHeader().setDefaultAlignment(Qt.AlignRight | Qt.AlignVCenter)
+            self.table.verticalHeader().setDefaultAlignment(ALIGN_RIGHT_VCENTER)
         except Exception:
             pass
 
@@ -1147,37 +1218,36 @@ class CentroidFinderWindow(QMainWindow):
             pass
 
         # Diagnostic: connect to commitData to detect editors that don't belong to a view
-        try:
-            from qt_compat.QtWidgets import QApplication
+        # (編集確定ごとにスタックトレースを出すので DEBUG 時のみ)
+        if DEBUG:
+            try:
+                from qt_compat.QtWidgets import QApplication
 
-            def _commit_diag(ed, view_name='table_ref', view=self.table_ref):
-                try:
-                    import sys, traceback
-                    fw = QApplication.focusWidget()
-                    print(f"[COMMITDATA_SIGNAL] view={view_name} editor={ed} focus={fw}", file=sys.stderr)
+                def _commit_diag(ed, view_name='table_ref', view=self.table_ref):
                     try:
-                        is_desc = bool(view.isAncestorOf(ed))
+                        import sys, traceback
+                        fw = QApplication.focusWidget()
+                        print(f"[COMMITDATA_SIGNAL] view={view_name} editor={ed} focus={fw}", file=sys.stderr)
+                        try:
+                            is_desc = bool(view.isAncestorOf(ed))
+                        except Exception:
+                            is_desc = False
+                        print(f"[COMMITDATA_SIGNAL] is_descendant_of_view={is_desc} editor_parent={getattr(ed, 'parent', None)}", file=sys.stderr)
+                        traceback.print_stack(limit=8)
                     except Exception:
-                        is_desc = False
-                    print(f"[COMMITDATA_SIGNAL] is_descendant_of_view={is_desc} editor_parent={getattr(ed, 'parent', None)}", file=sys.stderr)
-                    traceback.print_stack(limit=8)
-                except Exception:
-                    pass
+                        pass
 
-            try:
-                self.table_ref.commitData.connect(lambda ed: _commit_diag(ed, 'table_ref', self.table_ref))
-            except Exception:
-                pass
-            try:
-                self.table_ref_view.commitData.connect(lambda ed: _commit_diag(ed, 'table_ref_view', self.table_ref_view))
-            except Exception:
-                pass
-            try:
-                self.table_between.commitData.connect(lambda ed: _commit_diag(ed, 'table_between', self.table_between))
+                # table_ref_view / table_between はこの後で作られるので、存在するものだけ接続する
+                for view_name in ('table_ref', 'table_ref_view', 'table_between'):
+                    view = getattr(self, view_name, None)
+                    if view is None:
+                        continue
+                    try:
+                        view.commitData.connect(lambda ed, n=view_name, v=view: _commit_diag(ed, n, v))
+                    except Exception:
+                        pass
             except Exception:
                 pass
-        except Exception:
-            pass
 
         self.table.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
         self.table.setHorizontalScrollBarPolicy(Qt.ScrollBarAsNeeded)
@@ -1187,7 +1257,7 @@ class CentroidFinderWindow(QMainWindow):
         
         # 横スクロール状態が変わったら高さも再調整（右テーブル）
         try:
-            self.table.horizontalScrollBar().rangeChanged.connect(lambda _min, _max: fix_tables_height(self.table_ref, self.table))
+            self.table.horizontalScrollBar().rangeChanged.connect(self._on_table_hrange_changed)
         except Exception:
             pass
 
@@ -1238,16 +1308,10 @@ class CentroidFinderWindow(QMainWindow):
         self._dragging = False
         self._drag_start_vp = None  # ビューポート座標での押下位置
         self._drag_start_scroll = (0, 0)
-        self._drag_recent = deque(maxlen=8)  # (t, QPoint)
-        self._kinetic_timer = QTimer(self)
-        self._kinetic_timer.setInterval(16)
-        self._kinetic_timer.timeout.connect(self._on_kinetic_tick)
-        self._kinetic_vx = 0.0  # スクロール速度(px/秒)
-        self._kinetic_vy = 0.0
-        self._kinetic_last_t = 0.0
         # 表示用余白（スクロールの遊び）と描画状態
         self.view_padding = 200
         self._display_offset = (0, 0)   # 画像がキャンバス内で開始するラベル座標
+        self._inv_display_scale = None  # 1 / _display_scale (表示の倍率が決まるまでは None)
         self._display_img_size = (0, 0) # キャンバス内の画像サイズ（ズーム後）
         self._display_pm_base = None    # クロスヘア等を描く前のベースPixmap
         # 初回表示は画像中心から開始するためのフラグ
@@ -1287,13 +1351,7 @@ class CentroidFinderWindow(QMainWindow):
                 bcl.setSpacing(6)
                 self.lbl_boundary = QLabel("Boundary")
                 try:
-                    from qt_compat.QtGui import QFont as _QFont
-                    fb = _QFont('Segoe UI', 12)
-                    try:
-                        fb.setBold(True)
-                    except Exception:
-                        pass
-                    self.lbl_boundary.setFont(fb)
+                    self.lbl_boundary.setFont(self._ctrl_font_bold)
                     try:
                         self.lbl_boundary.setStyleSheet('font-weight: bold;')
                     except Exception:
@@ -1323,13 +1381,7 @@ class CentroidFinderWindow(QMainWindow):
                     # small label for the control
                     self.lbl_view_orientation = QLabel("View Orientation")
                     try:
-                        from qt_compat.QtGui import QFont as _QFont
-                        fv = _QFont('Segoe UI', 12)
-                        try:
-                            fv.setBold(True)
-                        except Exception:
-                            pass
-                        self.lbl_view_orientation.setFont(fv)
+                        self.lbl_view_orientation.setFont(self._ctrl_font_bold)
                         try:
                             self.lbl_view_orientation.setStyleSheet('font-weight: bold;')
                         except Exception:
@@ -1485,13 +1537,8 @@ class CentroidFinderWindow(QMainWindow):
 
         # スライダー/コントロールレイアウト（各項目を横一行にまとめ、アプリ共通フォントを使う）
         sliders_layout = QVBoxLayout()
-        from qt_compat.QtGui import QFont
         # Use Segoe UI 12 as the control font (match app-wide font)
-        try:
-            ctrl_font = QFont('Segoe UI', 12)
-            ctrl_font.setBold(False)
-        except Exception:
-            ctrl_font = QFont()
+        ctrl_font = self._ctrl_font
         # make rows a little taller / more airy so controls don't feel cramped
         try:
             # Reduce vertical gaps so labels feel tighter
@@ -1502,82 +1549,61 @@ class CentroidFinderWindow(QMainWindow):
 
         # NOTE: overlay slider moved to image header (right-top). See img_header insertion below.
 
+        # +/- ボタンは行のキーと増減量をプロパティに持ち、共通の _on_nudge_clicked から呼ぶ
+        self._nudgers = {}
+
         # Helper to build a single-row control with label, slider, and numeric box (+/-)
         def _build_control_row(key, name, edit_widget, slider_widget, nudger_minus, nudger_plus):
+            # 生成直後のウィジェットへの設定は失敗しないので、個別の try は付けない
+            # (何かあれば外側の except で None を返す)
             try:
                 row = QHBoxLayout()
-                try:
-                    row.setContentsMargins(0, 0, 0, 0)
-                    row.setSpacing(6)
-                except Exception:
-                    pass
+                row.setContentsMargins(0, 0, 0, 0)
+                row.setSpacing(6)
                 lbl = QLabel(name)
-                try:
-                    # Bold only the left-column labels requested by user
-                    f = QFont(ctrl_font)
-                    if str(key) in ('poster_level', 'min_area'):
-                        f.setBold(True)
-                    lbl.setFont(f)
-                except Exception:
-                    pass
-                try:
-                    # 固定幅にして、すぐ隣に数値ボックスが来るようにする（ラベルと数値の間に可変スペースを入れない）
-                    # Give labels more room so text doesn't clip; this also narrows the slider area.
-                    lbl.setFixedWidth(180)
-                    lbl.setAlignment(Qt.AlignVCenter | Qt.AlignLeft)
-                except Exception:
-                    pass
+                # Bold only the left-column labels requested by user
+                lbl.setFont(self._ctrl_font_bold if str(key) in ('poster_level', 'min_area') else ctrl_font)
+                # 固定幅にして、すぐ隣に数値ボックスが来るようにする（ラベルと数値の間に可変スペースを入れない）
+                # Give labels more room so text doesn't clip; this also narrows the slider area.
+                lbl.setFixedWidth(180)
+                lbl.setAlignment(ALIGN_LEFT_VCENTER)
                 row.addWidget(lbl)
                 # numeric + +/- on the left of the slider (number left, bar right)
                 box = QWidget()
-                try:
-                    box.setFixedWidth(self.control_area_width)
-                except Exception:
-                    pass
+                box.setFixedWidth(self.control_area_width)
 
                 bhl = QHBoxLayout(box)
                 bhl.setContentsMargins(0, 0, 0, 0)
                 bhl.setSpacing(0)
 
-                try:
-                    minus_btn = QPushButton("-")
-                    minus_btn.setFixedSize(28, 28)
-                    minus_btn.clicked.connect(lambda _, f=nudger_minus: f(-1))
-                except Exception:
-                    minus_btn = QPushButton("-")
-
-                try:
-                    plus_btn = QPushButton("+")
-                    plus_btn.setFixedSize(28, 28)
-                    plus_btn.clicked.connect(lambda _, f=nudger_plus: f(1))
-                except Exception:
-                    plus_btn = QPushButton("+")
-
-                try:
-                    # numeric edit: fixed width and height to match +/- buttons
-                    edit_widget.setFixedWidth(48)
-                    edit_widget.setFixedHeight(28)
-                    edit_widget.setSizePolicy(QSizePolicy.Fixed, QSizePolicy.Fixed)
-                    edit_widget.setAlignment(Qt.AlignCenter)
-                    edit_widget.setFont(ctrl_font)
-                except Exception:
-                    pass
-
-                try:
-                    minus_btn.setFont(ctrl_font)
-                    plus_btn.setFont(ctrl_font)
-                except Exception:
-                    pass
+                self._nudgers[(key, -1)] = nudger_minus
+                self._nudgers[(key, 1)] = nudger_plus
+                minus_btn = QPushButton("-")
+                minus_btn.setFixedSize(28, 28)
+                minus_btn.setProperty("nudge_key", key)
+                minus_btn.setProperty("nudge_delta", -1)
+                minus_btn.clicked.connect(self._on_nudge_clicked)
+
+                plus_btn = QPushButton("+")
+                plus_btn.setFixedSize(28, 28)
+                plus_btn.setProperty("nudge_key", key)
+                plus_btn.setProperty("nudge_delta", 1)
+                plus_btn.clicked.connect(self._on_nudge_clicked)
+
+                # numeric edit: fixed width and height to match +/- buttons
+                edit_widget.setFixedWidth(48)
+                edit_widget.setFixedHeight(28)
+                edit_widget.setSizePolicy(QSizePolicy.Fixed, QSizePolicy.Fixed)
+                edit_widget.setAlignment(Qt.AlignCenter)
+                edit_widget.setFont(ctrl_font)
+
+                minus_btn.setFont(ctrl_font)
+                plus_btn.setFont(ctrl_font)
 
                 # remove internal button padding and ensure consistent spacing
-                try:
-                    minus_btn.setStyleSheet("padding:0px; margin:0px;")
-                except Exception:
-                    pass
-                try:
-                    plus_btn.setStyleSheet("padding:0px; margin:0px;")
-                except Exception:
-                    pass
+                # (ルールは grain_section のスタイルシートに一度だけ書き、ボタンは名前で一致させる)
+                minus_btn.setObjectName("nudge")
+                plus_btn.setObjectName("nudge")
 
                 # add widgets with explicit equal spacers between them
                 bhl.addWidget(minus_btn)
@@ -1589,10 +1615,7 @@ class CentroidFinderWindow(QMainWindow):
                 row.addWidget(box)
 
                 # slider placed to the right; give it a modest fixed height to align with buttons
-                try:
-                    slider_widget.setFixedHeight(28)
-                except Exception:
-                    pass
+                slider_widget.setFixedHeight(28)
                 row.addWidget(slider_widget, 3)
                 return row
             except Exception:
@@ -1731,7 +1754,7 @@ class CentroidFinderWindow(QMainWindow):
         # backend and present `table_ref_view` to the user transposed).
         try:
             self.left_top_image = QLabel()
-            self.left_top_image.setAlignment(Qt.AlignLeft | Qt.AlignTop)
+            self.left_top_image.setAlignment(ALIGN_LEFT_TOP)
             self.left_top_image.setSizePolicy(QSizePolicy.Fixed, QSizePolicy.Fixed)
             base_dir = os.path.dirname(__file__)
             candidates = [
@@ -1740,29 +1763,26 @@ class CentroidFinderWindow(QMainWindow):
                 os.path.join(base_dir, "px2XY.png"),
                 os.path.join(base_dir, "app_icon.png"),
             ]
+            # Scale the logo up to a maximum width of 400px and fix label width
+            target_w = 450
+            target_h = 200
             pix = None
             for cand in candidates:
                 try:
-                    pm = QPixmap(cand)
+                    # 縮小済みのロゴはディスクにキャッシュされ、2回目以降はデコード・縮小を省く
+                    pm = load_scaled_pixmap_cached(cand, target_w, target_h)
                     if pm is not None and not pm.isNull():
                         pix = pm
                         break
                 except Exception:
                     continue
             if pix is not None:
+                self._left_top_pix = pix
+                self.left_top_image.setPixmap(self._left_top_pix)
                 try:
-                    # Scale the logo up to a maximum width of 400px and fix label width
-                    target_w = 450
-                    target_h = 200
-                    self._left_top_pix = pix.scaled(target_w, target_h, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-                    self.left_top_image.setPixmap(self._left_top_pix)
-                    try:
-                        self.left_top_image.setFixedSize(target_w, target_h)
-                    except Exception:
-                        pass
+                    self.left_top_image.setFixedSize(target_w, target_h)
                 except Exception:
-                    self._left_top_pix = pix
-                    self.left_top_image.setPixmap(pix)
+                    pass
             else:
                 self._left_top_pix = None
                 self.left_top_image.setText("PiXY")
@@ -1785,7 +1805,8 @@ class CentroidFinderWindow(QMainWindow):
             self.table_ref_view.setSelectionBehavior(QAbstractItemView.SelectRows)
             self.table_ref_view.setSelectionMode(QAbstractItemView.SingleSelection)
             self.table_ref_view.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
-            self.table_ref_view.setHorizontalScrollMode(QAbstractItemView.ScrollPerPixel)
+            # 横方向は列単位で十分 (固定ヘッダ側も列単位なので、スクロール値の同期もずれない)
+            self.table_ref_view.setHorizontalScrollMode(QAbstractItemView.ScrollPerItem)
             self.table_ref_view.setSizePolicy(QSizePolicy.Fixed, QSizePolicy.Expanding)
             # Keep scrollbar presence stable so widths don't jitter after Add/update
             try:
@@ -1799,7 +1820,12 @@ class CentroidFinderWindow(QMainWindow):
             except Exception:
                 pass
             try:
-                self.table_ref_view.verticalHeader().setDefaultAlignment(Qt.AlignHCenter | Qt.AlignVCenter)
+                self.table_ref_view.verticalHeader().setDefaultAlignment(ALIGN_HVCENTER)
+            except Exception:
+                pass
+            # 列は最初から最終的な幅で作る (表示後の _shrink_visible_columns で詰め直さずに済む)
+            try:
+                self._apply_fixed_column_sizing(self.table_ref_view)
             except Exception:
                 pass
         except Exception:
@@ -1837,7 +1863,11 @@ class CentroidFinderWindow(QMainWindow):
             self.table_between.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOn)
             self.table_between.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
             try:
-                self.table_between.verticalHeader().setDefaultAlignment(Qt.AlignHCenter | Qt.AlignVCenter)
+                self.table_between.verticalHeader().setDefaultAlignment(ALIGN_HVCENTER)
+            except Exception:
+                pass
+            try:
+                self._apply_fixed_column_sizing(self.table_between)
             except Exception:
                 pass
             try:
@@ -1868,13 +1898,7 @@ class CentroidFinderWindow(QMainWindow):
                 pass
             self.lbl_grain_ident = QLabel("Grain Identification")
             try:
-                from qt_compat.QtGui import QFont as _QFont
-                fgi = _QFont('Segoe UI', 12)
-                try:
-                    fgi.setBold(True)
-                except Exception:
-                    pass
-                self.lbl_grain_ident.setFont(fgi)
+                self.lbl_grain_ident.setFont(self._ctrl_font_bold)
                 try:
                     self.lbl_grain_ident.setStyleSheet('font-weight: bold;')
                 except Exception:
@@ -1902,6 +1926,8 @@ class CentroidFinderWindow(QMainWindow):
 
         try:
             self.grain_section = QWidget()
+            # +/- ボタン (objectName "nudge") の余白を消す。ボタンごとに setStyleSheet すると毎回パースされる
+            self.grain_section.setStyleSheet(NUDGE_BUTTON_QSS)
             gl = QVBoxLayout(self.grain_section)
             gl.setContentsMargins(0, 0, 0, 0)
             gl.setSpacing(6)
@@ -2133,9 +2159,9 @@ class CentroidFinderWindow(QMainWindow):
                                             try:
                                                 # Group header row (Image/Stage) should be left-aligned
                                                 if int(row) == 0:
-                                                    new_item.setTextAlignment(Qt.AlignLeft | Qt.AlignVCenter)
+                                                    new_item.setTextAlignment(ALIGN_LEFT_VCENTER)
                                                 else:
-                                                    new_item.setTextAlignment(Qt.AlignHCenter | Qt.AlignVCenter)
+                                                    new_item.setTextAlignment(ALIGN_HVCENTER)
                                             except Exception:
                                                 pass
                                             try:
@@ -2310,16 +2336,25 @@ class CentroidFinderWindow(QMainWindow):
             Qt.WindowSystemMenuHint
         )
         self.setCentralWidget(main_container)
-        # Native decorations used; schedule applying DWM titlebar style after show
+        # 表示後の調整 (DWM タイトルバー、列幅、左上ロゴ幅) はまとめて一度だけ実行する
         try:
-            QTimer.singleShot(0, self._apply_windows_titlebar_style)
+            QTimer.singleShot(150, self._post_show_layout)
         except Exception:
             pass
-        # Ensure column shrinking runs after layout/show so startup view matches adjusted widths
+
+    def _post_show_layout(self):
+        """起動後、レイアウトが落ち着いてから一度だけ行う調整 (再描画も一度にまとめる)。"""
+        self.setUpdatesEnabled(False)
         try:
-            QTimer.singleShot(150, self._shrink_visible_columns)
-        except Exception:
-            pass
+            for step in (self._apply_windows_titlebar_style,
+                         self._shrink_visible_columns,
+                         self._sync_left_top_image_width):
+                try:
+                    step()
+                except Exception:
+                    pass
+        finally:
+            self.setUpdatesEnabled(True)
 
     def changeEvent(self, event):
         try:
@@ -2330,6 +2365,10 @@ class CentroidFinderWindow(QMainWindow):
                         self.title.update_max_icon()
                 except Exception:
                     pass
+                # 最大化/復元後に列幅とロゴ幅を合わせ直す (連続した切り替えは一回にまとめる)
+                if not getattr(self, '_relayout_pending', False):
+                    self._relayout_pending = True
+                    QTimer.singleShot(100, self._relayout_after_state_change)
         except Exception:
             pass
         try:
@@ -2337,126 +2376,17 @@ class CentroidFinderWindow(QMainWindow):
         except Exception:
             return None
 
-        # After the layout stabilizes, shrink visible transposed-table columns
-        try:
-            QTimer.singleShot(100, self._shrink_visible_columns)
-        except Exception:
-            pass
-        # 中央カラム（table_between）を1列分狭める処理も実行
-        try:
-            QTimer.singleShot(150, self._narrow_center_column)
-        except Exception:
-            pass
-        # 左上画像を左カラム幅に合わせる同期処理
-        try:
-            QTimer.singleShot(160, self._sync_left_top_image_width)
-        except Exception:
-            pass
-
-        # 配線
-        self._wire_levels()
-        self._wire(self.edit_min_area, self.slider_min_area)
-        self._wire(self.edit_trim, self.slider_trim)
-        self._wire(self.edit_neck_sep, self.slider_neck_sep)
-        self._wire(self.edit_shape_complex, self.slider_shape_complex)
-        # Ref の Obs.* 入力保持用（内部容量は10）
-        self.ref_obs = [{"x": "", "y": "", "z": ""} for _ in range(10)]
-        # 入力変更を監視（半角正規化）
-        self.table_ref.itemChanged.connect(self._on_ref_item_changed)
-
-        # 起動直後に一度テーブルを構築（左表を3列で表示しておく）
-        try:
-            self._safe_populate_tables(
-                self.table_ref,
-                self.table,
-                self.ref_points,
-                self.ref_obs,
-                [],
-                self.selected_index,
-                self.ref_selected_index,
-                flip_mode=self.flip_mode,
-                visible_ref_cols=self.visible_ref_cols,
-            )
-            # 初期の列幅/高さを反映
-            try:
-                fix_tables_height(self.table_ref, self.table)
-            except Exception:
-                pass
-            # 下部テーブルは5行固定なので、その表示に合わせて高さを固定する
-            try:
-                rows_fixed = 6
-                row_h = self.table.verticalHeader().defaultSectionSize()
-                hdr_h = self.table.horizontalHeader().height()
-                # フレームや余白分の余裕を少し加える
-                extra = 4
-                try:
-                    # frameWidth is a method on some styles; try to call if present
-                    fw = self.table.frameWidth() if hasattr(self.table, 'frameWidth') else 2
-                    extra = max(4, fw * 2)
-                except Exception:
-                    extra = 4
-                total_h = hdr_h + int(row_h) * rows_fixed + extra
-                # Reapply fixed height after layout settles to avoid later overwrites.
-                def _apply_fixed_height():
-                    try:
-                        # Ensure vertical size policy is Fixed so layout doesn't stretch it.
-                        self.table.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
-                        # Always compute and store the exact height for 5 rows
-                        h = total_h
-                        try:
-                            self.FIXED_TABLE_HEIGHT = int(h)
-                        except Exception:
-                            pass
-                        # Also set per-row height to eliminate extra blank space inside the table.
-                        try:
-                            # choose a reasonable per-row height; prefer existing default if available
-                            row_h = int(self.table.verticalHeader().defaultSectionSize() or 20)
-                            # enforce a maximum to avoid overly large rows
-                            if row_h > 48:
-                                row_h = 24
-                            # set vertical header to fixed mode and apply default
-                            try:
-                                self.table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
-                            except Exception:
-                                pass
-                            self.table.verticalHeader().setDefaultSectionSize(row_h)
-                            # apply to all current rows
-                            for rr in range(self.table.rowCount()):
-                                try:
-                                    self.table.setRowHeight(rr, row_h)
-                                except Exception:
-                                    pass
-                        except Exception:
-                            pass
-                        self.table.setFixedHeight(h)
-                    except Exception:
-                        try:
-                            self.table.setFixedHeight(total_h)
-                        except Exception:
-                            pass
-                try:
-                    QTimer.singleShot(0, _apply_fixed_height)
-                except Exception:
-                    # fallback: apply immediately
-                    _apply_fixed_height()
-            except Exception:
-                pass
-        except Exception:
-            pass
-
-        # Enforce button heights after layout settles
+    def _relayout_after_state_change(self):
+        """ウィンドウ状態の変化後、レイアウトが落ち着いてから列幅とロゴ幅を調整する。"""
         try:
-            QTimer.singleShot(300, self._enforce_button_heights)
+            self._shrink_visible_columns()
         except Exception:
             pass
-
-        # Apply button styling (colors, widths, bold, rounded corners)
         try:
-            QTimer.singleShot(0, self._apply_button_styles)
+            self._sync_left_top_image_width()
         except Exception:
             pass
-
-        self.open_image()
+        self._relayout_pending = False
 
     # オーバーレイ表示モード（Original/Posterized）変更ハンドラ
     def _on_overlay_mode_changed(self, idx):
@@ -2474,6 +2404,7 @@ class CentroidFinderWindow(QMainWindow):
         self.schedule_update(force=True)
 
     # 境界線表示トグルハンドラ
+    @pyqtSlot(bool)
     def _on_toggle_boundaries(self, checked):
         self.show_boundaries = bool(checked)
         try:
@@ -2572,7 +2503,10 @@ class CentroidFinderWindow(QMainWindow):
         slider.setValue(init)
         slider.setTickInterval(tick)
         slider.setTickPosition(QSlider.TicksBelow)
-        slider.valueChanged.connect(lambda v, e=edit: self._sync_from_slider(e, v))
+        # 対応する編集ボックスはスライダーのプロパティに持たせ、共通のスロットで同期する
+        slider.setProperty("edit_widget", edit)
+        slider.valueChanged.connect(self._on_spin_slider_changed)
+        slider.sliderReleased.connect(self._flush_scheduled_update)
         # name is expected to be a code-safe key (e.g. 'poster_level', 'min_area')
         try:
             if name == 'poster_level':
@@ -2602,7 +2536,9 @@ class CentroidFinderWindow(QMainWindow):
                     pass
         except Exception:
             pass
-        edit.returnPressed.connect(lambda e=edit, s=slider: self._sync_from_edit(e, s))
+        # 対応するスライダーはプロパティに持たせ、共通の _on_edit_return_pressed から引く
+        edit.setProperty("paired_slider", slider)
+        edit.returnPressed.connect(self._on_edit_return_pressed)
 
     # PosterLevel専用の配線（上限20超の内部値を保持）
     def _wire_levels(self):
@@ -2627,6 +2563,7 @@ class CentroidFinderWindow(QMainWindow):
         self.slider_levels.valueChanged.connect(self._on_levels_slider_changed)
 
     # PosterLevelスライダー変更ハンドラ
+    @pyqtSlot(int)
     def _on_levels_slider_changed(self, v):
         # スライダー操作は上限20まで。内部値も更新
         self.levels_value = int(v)
@@ -2634,6 +2571,7 @@ class CentroidFinderWindow(QMainWindow):
         self.schedule_update()
 
     # PosterLevel編集確定ハンドラ
+    @pyqtSlot()
     def _on_levels_edit_finished(self):
         text = self.edit_levels.text().strip()
         try:
@@ -2742,7 +2680,8 @@ class CentroidFinderWindow(QMainWindow):
                 self.slider_levels.blockSignals(False)
             except Exception:
                 pass
-        self.schedule_update(force=True)
+        # 連打されたときは update_timer でまとめて一回だけ再計算する
+        self.schedule_update()
 
     def _ensure_ref_view_delegate(self):
         """Install the transposed-table delegate once.
@@ -2755,11 +2694,7 @@ class CentroidFinderWindow(QMainWindow):
         self._ref_view_delegate_installed = True
 
         try:
-            from qt_compat.QtWidgets import QStyledItemDelegate, QLineEdit, QTableWidgetItem
-            from qt_compat.QtWidgets import QAbstractItemDelegate
-            from qt_compat.QtCore import Qt as _Qt, QTimer
-
-            owner = self
+            from qt_compat.QtWidgets import QStyledItemDelegate
 
             class TransposedRefDelegate(QStyledItemDelegate):
                 def __init__(self, view, src_table, owner_window=None):
@@ -2768,167 +2703,121 @@ class CentroidFinderWindow(QMainWindow):
                     self.src_table = src_table
                     self.owner_window = owner_window
 
-                def createEditor(self, parent, option, index):
-                    editor = super().createEditor(parent, option, index)
-                    try:
-                        if isinstance(editor, QLineEdit):
-                            vr, vc = index.row(), index.column()  # view coords
-
-                            def on_return():
-                                # Capture text before the editor is potentially destroyed.
-                                try:
-                                    txt = editor.text()
-                                except Exception:
-                                    txt = None
-
-                                # Ensure the edited value becomes visible in the cell.
-                                # (Some QTableWidget setups do not immediately repaint/update on Return.)
-                                try:
-                                    if txt is not None:
-                                        def _apply_txt():
-                                            try:
-                                                it = self.view.item(vr, vc)
-                                                if it is None:
-                                                    try:
-                                                        it = QTableWidgetItem("")
-                                                        self.view.setItem(vr, vc, it)
-                                                    except Exception:
-                                                        it = None
-                                                if it is not None:
-                                                    it.setText(str(txt))
-                                            except Exception:
-                                                pass
-
-                                        try:
-                                            QTimer.singleShot(0, _apply_txt)
-                                        except Exception:
-                                            _apply_txt()
-                                except Exception:
-                                    pass
-
-                                # 3) Move after the event loop processes the commit
-                                def _move_next():
-                                    try:
-                                        # Map view coords back to source table: src_row = vc, src_col = vr
-                                        src_r = vc
-                                        src_c = vr
-                                        if src_r == 2:
-                                            tgt_src_r = 3; tgt_src_c = src_c
-                                        elif src_r == 3:
-                                            tgt_src_r = 4; tgt_src_c = src_c
-                                        elif src_r == 4:
-                                            tgt_src_r = 2; tgt_src_c = min(src_c + 1, self.src_table.columnCount() - 1)
-                                        else:
-                                            return
-                                        # Map back to view coords
-                                        view_r = tgt_src_c
-                                        view_c = tgt_src_r
-                                        self.view.setCurrentCell(view_r, view_c)
-                                        item = self.view.item(view_r, view_c)
-                                        if item is not None and (item.flags() & getattr(_Qt, 'ItemIsEditable', 0)):
-                                            try:
-                                                self.view.setFocus()
-                                            except Exception:
-                                                pass
-                                            # Start editing after selection/focus has settled.
-                                            def _start_edit():
-                                                try:
-                                                    self.view.editItem(item)
-                                                except Exception:
-                                                    pass
-
-                                            try:
-                                                QTimer.singleShot(0, _start_edit)
-                                            except Exception:
-                                                _start_edit()
-                                    except Exception:
-                                        pass
-
-                                try:
-                                    QTimer.singleShot(0, _move_next)
-                                except Exception:
-                                    _move_next()
-
-                            editor.returnPressed.connect(on_return)
-                    except Exception:
-                        pass
-                    return editor
-
             try:
-                self.table_ref_view.setItemDelegate(TransposedRefDelegate(self.table_ref_view, self.table_ref, owner_window=owner))
+                delegate = TransposedRefDelegate(self.table_ref_view, self.table_ref, owner_window=self)
+                self.table_ref_view.setItemDelegate(delegate)
+                # Enter で確定したら次のセルへ。エディタごとに returnPressed をつながず、
+                # ビューが編集を閉じた後 (setItemDelegate でつながる側の後) に一度だけ呼ばれる
+                delegate.closeEditor.connect(self._on_ref_editor_closed)
             except Exception:
                 pass
         except Exception:
             pass
 
+    @pyqtSlot(QWidget, QAbstractItemDelegate.EndEditHint)
+    def _on_ref_editor_closed(self, editor, hint):
+        # Return/Enter は SubmitModelCache で閉じる (Esc は RevertModelCache、フォーカスアウトは NoHint)
+        if hint == QAbstractItemDelegate.SubmitModelCache:
+            self._move_next_ref_cell()
+
+    def _move_next_ref_cell(self):
+        """table_ref_view の編集中セルから次の入力セル (Stage X→Y→Z→次の行の X) へ移って編集を始める。"""
+        view = getattr(self, 'table_ref_view', None)
+        if view is None:
+            return
+        cur = view.currentIndex()
+        if not cur.isValid():
+            return
+        # Map view coords back to source table: src_row = vc, src_col = vr
+        src_r = cur.column()
+        src_c = cur.row()
+        if src_r == 2:
+            tgt_src_r = 3; tgt_src_c = src_c
+        elif src_r == 3:
+            tgt_src_r = 4; tgt_src_c = src_c
+        elif src_r == 4:
+            tgt_src_r = 2; tgt_src_c = min(src_c + 1, self.table_ref.columnCount() - 1)
+        else:
+            return
+        # Map back to view coords
+        view_r = tgt_src_c
+        view_c = tgt_src_r
+        try:
+            view.setCurrentCell(view_r, view_c)
+            item = view.item(view_r, view_c)
+            if item is not None and (item.flags() & Qt.ItemIsEditable):
+                view.setFocus()
+                view.editItem(item)
+        except Exception:
+            pass
+
     def _defer_recompute_after_ref_edit(self):
         """Coalesce recompute requests triggered by transposed ref edits."""
+        # 値が変わっていない編集 (同じ値の再入力など) では再計算しない
+        if not self._ref_recompute_dirty:
+            return
+        # 連続した編集は最後の編集から 150ms 後の一回にまとめる (タイマーは使い回し)
+        # Delay helps avoid racing the editor close + next-cell edit sequence.
+        self._ref_recompute_timer.start()
+
+    @pyqtSlot()
+    def _run_deferred_ref_recompute(self):
+        if not self._ref_recompute_dirty:
+            return
+        self._ref_recompute_dirty = False
         try:
-            if getattr(self, '_recompute_ref_pending', False):
-                return
-            self._recompute_ref_pending = True
+            self._safe_populate_tables(
+                self.table_ref,
+                self.table,
+                self.ref_points,
+                self.ref_obs,
+                self.centroids,
+                self.selected_index,
+                self.ref_selected_index,
+                flip_mode=self.flip_mode,
+                visible_ref_cols=self.visible_ref_cols,
+            )
         except Exception:
             pass
-
         try:
-            from qt_compat.QtCore import QTimer
-
-            def _run():
-                try:
-                    self._recompute_ref_pending = False
-                except Exception:
-                    pass
-                try:
-                    self._safe_populate_tables(
-                        self.table_ref,
-                        self.table,
-                        self.ref_points,
-                        self.ref_obs,
-                        self.centroids,
-                        self.selected_index,
-                        self.ref_selected_index,
-                        flip_mode=self.flip_mode,
-                        visible_ref_cols=self.visible_ref_cols,
-                    )
-                except Exception:
-                    pass
-                try:
-                    self._refresh_transposed_views()
-                except Exception:
-                    pass
-
-            # Delay helps avoid racing the editor close + next-cell edit sequence.
-            QTimer.singleShot(150, _run)
+            self._refresh_transposed_views()
         except Exception:
-            # Fallback: run immediately
-            try:
-                self._recompute_ref_pending = False
-            except Exception:
-                pass
-            try:
-                self._safe_populate_tables(
-                    self.table_ref,
-                    self.table,
-                    self.ref_points,
-                    self.ref_obs,
-                    self.centroids,
-                    self.selected_index,
-                    self.ref_selected_index,
-                    flip_mode=self.flip_mode,
-                    visible_ref_cols=self.visible_ref_cols,
-                )
-            except Exception:
-                pass
-            try:
-                self._refresh_transposed_views()
-            except Exception:
-                pass
+            pass
 
     # スライダーから編集ボックスへ同期
     def _sync_from_slider(self, edit, val):
         edit.setText(str(val))
         self.schedule_update()
 
+    # _make_spin_slider のスライダー共通ハンドラ (編集ボックスは "edit_widget" プロパティ)
+    @pyqtSlot(int)
+    def _on_spin_slider_changed(self, val):
+        slider = self.sender()
+        edit = slider.property("edit_widget") if slider is not None else None
+        if edit is not None:
+            self._sync_from_slider(edit, val)
+
+    # +/- ボタン共通ハンドラ (行のキーと増減量はボタンのプロパティ)
+    @pyqtSlot()
+    def _on_nudge_clicked(self):
+        btn = self.sender()
+        if btn is None:
+            return
+        delta = int(btn.property("nudge_delta") or 0)
+        nudger = self._nudgers.get((btn.property("nudge_key"), delta))
+        if nudger is not None:
+            nudger(delta)
+
+    # _wire した編集ボックスの Enter 共通ハンドラ (スライダーは "paired_slider" プロパティ)
+    @pyqtSlot()
+    def _on_edit_return_pressed(self):
+        edit = self.sender()
+        if edit is None:
+            return
+        slider = edit.property("paired_slider")
+        if slider is not None:
+            self._sync_from_edit(edit, slider)
+
     # 編集ボックスからスライダーへ同期 (Enter確定)
     def _sync_from_edit(self, edit, slider):
         try:
@@ -2948,7 +2837,7 @@ class CentroidFinderWindow(QMainWindow):
         cur = max(self.slider_min_area.minimum(), min(self.slider_min_area.maximum(), cur + int(delta)))
         self.slider_min_area.setValue(cur)
         self.edit_min_area.setText(str(cur))
-        self.schedule_update(force=True)
+        self.schedule_update()
 
     def _nudge_trim(self, delta):
         try:
@@ -2958,7 +2847,7 @@ class CentroidFinderWindow(QMainWindow):
         cur = max(self.slider_trim.minimum(), min(self.slider_trim.maximum(), cur + int(delta)))
         self.slider_trim.setValue(cur)
         self.edit_trim.setText(str(cur))
-        self.schedule_update(force=True)
+        self.schedule_update()
 
     def _nudge_neck_sep(self, delta):
         try:
@@ -2968,7 +2857,7 @@ class CentroidFinderWindow(QMainWindow):
         cur = max(self.slider_neck_sep.minimum(), min(self.slider_neck_sep.maximum(), cur + int(delta)))
         self.slider_neck_sep.setValue(cur)
         self.edit_neck_sep.setText(str(cur))
-        self.schedule_update(force=True)
+        self.schedule_update()
 
     def _nudge_shape_complex(self, delta):
         try:
@@ -2978,7 +2867,7 @@ class CentroidFinderWindow(QMainWindow):
         cur = max(self.slider_shape_complex.minimum(), min(self.slider_shape_complex.maximum(), cur + int(delta)))
         self.slider_shape_complex.setValue(cur)
         self.edit_shape_complex.setText(str(cur))
-        self.schedule_update(force=True)
+        self.schedule_update()
 
     # 画像ファイルを開くダイアログを表示
     def open_image(self):
@@ -3019,7 +2908,7 @@ class CentroidFinderWindow(QMainWindow):
             pass
 
         try:
-            self.img_full = cv2.imdecode(np.fromfile(fname, dtype=np.uint8), cv2.IMREAD_COLOR)
+            self.img_full = imread_color(fname)
             if self.img_full is None:
                 raise ValueError("画像の読み込みに失敗しました")
             save_last_image_path(fname)
@@ -3034,7 +2923,7 @@ class CentroidFinderWindow(QMainWindow):
         except Exception:
             pass
         # 画像が変わったのでキャッシュ破棄
-        self._cache = {"img_id": id(self.proc_img), "levels": None, "min_area": None, "trim_px": None, "poster": None, "centroids": None}
+        self._cache = {"img_id": id(self.proc_img), "levels": None, "min_area": None, "trim_px": None, "poster": None, "palette": None, "labels": None, "centroids": None}
         # 次回更新時に画像中心へスクロール
         self._initial_center_done = False
         self.schedule_update(force=True)
@@ -3064,19 +2953,148 @@ class CentroidFinderWindow(QMainWindow):
         except Exception:
             pass
         if w <= self.proc_target_width:
-            self.proc_img = self.img_full.copy()
+            # 縮小不要なら同じ配列を使う (どちらもその場で書き換えないのでコピーしない)
+            self.proc_img = self.img_full
             self.scale_proc_to_full = 1.0
         else:
             scale = self.proc_target_width / float(w)
             new_w = self.proc_target_width
             new_h = max(1, int(round(h * scale)))
-            self.proc_img = cv2.resize(self.img_full, (new_w, new_h), interpolation=cv2.INTER_AREA)
+            # 2 倍を超える縮小は pyrDown (5x5 平滑化 + 1/2 間引き) で目標幅の 2 倍以下まで
+            # 落としてから INTER_AREA で仕上げる (巨大画像を 1 回の INTER_AREA で縮小するより速い)
+            src = self.img_full
+            while src.shape[1] > 2 * new_w:
+                src = cv2.pyrDown(src)
+            self.proc_img = cv2.resize(src, (new_w, new_h), interpolation=cv2.INTER_AREA)
             self.scale_proc_to_full = 1.0 / scale
         self.centroid_processor = CentroidProcessor(self.proc_img, self.scale_proc_to_full, self.img_full)
         try:
             self._dbg(f"_build_processing_image: proc_img size={self.proc_img.shape[1]}x{self.proc_img.shape[0]}")
         except Exception:
             pass
+        self._start_poster_precompute()
+
+    def _start_poster_precompute(self):
+        """現在の K の近く (± POSTER_PRECOMPUTE_RADIUS) の K-means ポスターをバックグラウンドで計算しておく。
+
+        結果は proc_img ごとの {K: (poster, palette, labels)} に入れ、スライダー操作時は
+        _get_poster がそこから返す (未計算の K だけその場で計算する)。
+        現在の K に近い値から順に計算し、別の画像の読み込みや終了時 (_stop_poster_workers) に打ち切る。
+        """
+        # 前の画像の先行計算は止める (K-means 1 回の途中では止まらないので待たない)
+        self._poster_stop.set()
+        stop = self._poster_stop = threading.Event()
+        img = self.proc_img
+        posters = {}
+        self._poster_cache = {"img": img, "posters": posters}
+        if img is None:
+            return
+        try:
+            sl = self.slider_num_groups
+            lo, hi, cur = int(sl.minimum()), int(sl.maximum()), int(sl.value())
+        except Exception:
+            lo, hi, cur = 2, 20, 2
+        lo = max(lo, cur - POSTER_PRECOMPUTE_RADIUS)
+        hi = min(hi, cur + POSTER_PRECOMPUTE_RADIUS)
+        # 現在の K は前景で計算されるので最後 (まだ無ければ計算する)
+        order = sorted(range(lo, hi + 1), key=lambda k: (k == cur, abs(k - cur), k))
+
+        def _run():
+            for k in order:
+                if stop.is_set():
+                    return
+                if k in posters:
+                    continue
+                try:
+                    posters.setdefault(k, kmeans_posterize(img, k, return_labels=True))
+                except Exception:
+                    return
+
+        self._start_poster_thread(_run, "poster-precompute")
+
+    def _start_poster_thread(self, target, name):
+        """K-means のワーカースレッドを起動し、終了時に待てるよう記録する。"""
+        self._poster_threads = [t for t in self._poster_threads if t.is_alive()]
+        th = threading.Thread(target=target, name=name, daemon=True)
+        self._poster_threads.append(th)
+        th.start()
+
+    def _stop_poster_workers(self):
+        """先行計算を打ち切り、実行中の K-means ワーカーが終わるまで待つ (終了時用)。"""
+        self._poster_stop.set()
+        for th in self._poster_threads:
+            try:
+                th.join()
+            except Exception:
+                pass
+        self._poster_threads = []
+
+    def closeEvent(self, event):
+        self._stop_poster_workers()
+        super().closeEvent(event)
+
+    def _get_poster(self, levels):
+        """現在の proc_img のポスター (poster, palette, labels) を返す (計算済みなら再利用)。"""
+        cache = getattr(self, '_poster_cache', None)
+        if cache is None or cache.get("img") is not self.proc_img:
+            cache = {"img": self.proc_img, "posters": {}}
+            self._poster_cache = cache
+        k = int(levels)
+        res = cache["posters"].get(k)
+        if res is None:
+            res = cache["posters"].setdefault(k, kmeans_posterize(self.proc_img, k, return_labels=True))
+        return res
+
+    def _has_poster(self, levels):
+        """現在の proc_img の levels 色のポスターが計算済みなら True。"""
+        cache = getattr(self, '_poster_cache', None)
+        return cache is not None and cache.get("img") is self.proc_img and int(levels) in cache["posters"]
+
+    def _poster_failed(self, levels):
+        """現在の proc_img の levels 色の K-means がワーカーで失敗していれば True。"""
+        cache = getattr(self, '_poster_cache', None)
+        return cache is not None and cache.get("img") is self.proc_img and int(levels) in cache.get("failed", ())
+
+    def _compute_poster_async(self, levels):
+        """levels 色のポスターをワーカースレッドで計算し、終わったら _posterReady で知らせる。
+
+        スライダー操作中に K-means で GUI スレッドを止めないため。同じ K は 1 本だけ走らせる。
+        失敗した K は cache["failed"] に記録し、次の更新では非同期に回さず同期計算に任せる
+        (記録しないと完了通知 → 再計算 → 失敗を繰り返す)。
+        """
+        cache = getattr(self, '_poster_cache', None)
+        if cache is None or cache.get("img") is not self.proc_img:
+            cache = {"img": self.proc_img, "posters": {}}
+            self._poster_cache = cache
+        pending = cache.setdefault("pending", set())
+        k = int(levels)
+        if k in pending:
+            return
+        pending.add(k)
+        failed = cache.setdefault("failed", set())
+        img = cache["img"]
+        posters = cache["posters"]
+
+        def _run():
+            try:
+                posters.setdefault(k, kmeans_posterize(img, k, return_labels=True))
+            except Exception:
+                failed.add(k)
+            finally:
+                pending.discard(k)
+            try:
+                self._posterReady.emit(img)
+            except RuntimeError:
+                # ウィンドウが既に破棄されている
+                pass
+
+        self._start_poster_thread(_run, "poster-worker")
+
+    @pyqtSlot(object)
+    def _on_poster_ready(self, img):
+        # 別の画像に切り替わっていれば古い結果は使わない
+        if img is self.proc_img:
+            self.schedule_update()
 
     def _disable_win_shadow(self):
         """Disable Windows DWM non-client rendering to remove the OS drop-shadow/frame.
@@ -3085,6 +3103,9 @@ class CentroidFinderWindow(QMainWindow):
         """
         if os.name != 'nt':
             return
+        # Windows 専用なので ctypes はここで読み込む (他の OS では起動時に読み込まない)
+        import ctypes
+        from ctypes import wintypes
         try:
             hwnd = int(self.winId())
             # DWMWA_NCRENDERING_POLICY = 2, DWMNCRP_DISABLED = 0
@@ -3102,6 +3123,7 @@ class CentroidFinderWindow(QMainWindow):
         """
         if os.name != 'nt':
             return
+        import ctypes
         GWL_STYLE = -16
         WS_OVERLAPPED = 0x00000000
         WS_CAPTION = 0x00C00000
@@ -3127,6 +3149,8 @@ class CentroidFinderWindow(QMainWindow):
         """
         if os.name != 'nt':
             return
+        import ctypes
+        from ctypes import wintypes
         try:
             hwnd = int(self.winId())
             # Common DWM attribute IDs (may vary by OS build)
@@ -3177,6 +3201,17 @@ class CentroidFinderWindow(QMainWindow):
         else:
             self.update_timer.start()
 
+    # タイマー経由の更新は、ポスター未計算なら K-means をワーカーに任せて待たない
+    @pyqtSlot()
+    def _on_update_timer(self):
+        self._update_image_actual(allow_async=True)
+
+    # スライダーを離したら、待っている更新をすぐに実行する (最後の値を遅延なく反映)
+    @pyqtSlot()
+    def _flush_scheduled_update(self):
+        if self.update_timer.isActive():
+            self.schedule_update(force=True)
+
         # 現在の処理パラメータを取得
     def _get_params(self):
         # Number of Groups is the single source of truth for k-means levels.
@@ -3319,7 +3354,87 @@ class CentroidFinderWindow(QMainWindow):
             except Exception:
                 pass
 
-    def _update_image_actual(self):
+    def _get_poster_full(self, poster):
+        """
+        proc 解像度の poster を表示用にフル解像度へ拡大して返す (INTER_LINEAR)。
+
+        結果は self._cache に poster と一緒に持ち、同じ poster・同じフル画像サイズなら
+        拡大し直さない (Min Area や Trim だけを動かしたときの全画素 resize を省く)。
+        返す配列は共有なので、書き換えるときは呼び出し側でコピーすること。
+
+        Args:
+            poster: ポスタライズ画像 (proc_img 解像度)
+
+        Returns:
+            poster_full
+        """
+        return self._get_upscaled_poster(poster, "poster_full", cv2.INTER_LINEAR)
+
+    def _get_poster_edges_full(self, poster):
+        """境界検出用に最近傍でフル解像度へ拡大した poster を返す (キャッシュは _get_poster_full と同じ)。"""
+        # Boundary のエッジ検出は最近傍で拡大したポスターを使う（線が太くなる原因を避ける）
+        return self._get_upscaled_poster(poster, "poster_edges_full", cv2.INTER_NEAREST)
+
+    def _get_upscaled_poster(self, poster, key, interpolation):
+        full_size = (self.img_full.shape[1], self.img_full.shape[0]) if self.img_full is not None else None
+        cached = self._cache.get(key)
+        if cached is not None and cached[0] is poster and cached[1] == full_size:
+            return cached[2]
+        scale = 1.0 / self.scale_proc_to_full if getattr(self, 'scale_proc_to_full', 1.0) != 0 else 1.0
+        if scale != 1.0 and full_size is not None:
+            out = cv2.resize(poster, full_size, interpolation=interpolation)
+        else:
+            # 等倍なら拡大しない (読むだけなので poster を共有する)
+            out = poster
+        # poster 自体を参照で持つので、id の使い回しで別の poster と取り違えることはない
+        self._cache[key] = (poster, full_size, out)
+        return out
+
+    def _get_full_boundary_mask(self, boundary_mask, size):
+        """centroid_processor の境界マスクを表示サイズ (w, h) の uint8 にして返す (同じマスクなら前回の結果)。"""
+        cached = self._cache.get("boundary_mask_full")
+        if cached is not None and cached[0] is boundary_mask and cached[1] == size:
+            return cached[2]
+        bm = boundary_mask
+        if bm.shape[:2] != (size[1], size[0]):
+            bm = cv2.resize(bm, size, interpolation=cv2.INTER_NEAREST)
+        bm = bm.astype(np.uint8)
+        self._cache["boundary_mask_full"] = (boundary_mask, size, bm)
+        return bm
+
+    def _overlay_buffer_like(self, img):
+        """
+        表示用オーバーレイの出力バッファを返す (img と同じ形なら前回のものを使い回す)。
+
+        フル解像度の配列を描画のたびに確保しない。中身は次の描画で上書きされるので、
+        _last_overlay_full 以外で保持しないこと。
+        """
+        buf = getattr(self, '_overlay_buf', None)
+        if buf is None or buf.shape != img.shape or buf.dtype != img.dtype:
+            buf = np.empty_like(img)
+            self._overlay_buf = buf
+        return buf
+
+    def _overlay_buffer_from(self, img):
+        """img をオーバーレイ用バッファにコピーして返す (境界線はこのバッファに描き込む)。"""
+        buf = self._overlay_buffer_like(img)
+        np.copyto(buf, img)
+        return buf
+
+    def _get_trimmed_edge_src(self, poster_edges_full, trim_px):
+        """境界検出に使う、Trim を適用したフル解像度ポスターを返す (同じ入力なら前回の結果)。"""
+        trim_px = int(trim_px or 0)
+        if trim_px <= 0:
+            return poster_edges_full
+        cached = self._cache.get("edge_src")
+        if cached is not None and cached[0] is poster_edges_full and cached[1] == trim_px:
+            return cached[2]
+        # 色ごとの erode を、境界からの距離で一度に行う
+        edge_src = trim_color_regions(poster_edges_full, trim_px)
+        self._cache["edge_src"] = (poster_edges_full, trim_px, edge_src)
+        return edge_src
+
+    def _update_image_actual(self, allow_async=False):
         if self._painting:
             return
         self._painting = True
@@ -3339,7 +3454,8 @@ class CentroidFinderWindow(QMainWindow):
             params = self._get_params()
             if self.proc_img is None:
                 self._build_processing_image()
-            overlay_full = self.img_full.copy()
+            # 重心処理が無ければ原画像をそのまま表示 (下で書き換えないのでコピーしない)
+            overlay_full = self.img_full
             centroids = []
             if self.centroid_processor:
                 # 判定: 自動更新モードか手動モードかで重い処理の実行を切り替える
@@ -3356,19 +3472,30 @@ class CentroidFinderWindow(QMainWindow):
                 areas_now = cache_areas
                 boundary_mask_now = self._cache.get("boundary_mask")
 
+                # K-means の結果は画像と色数だけで決まる。くびれ分割などの変更は
+                # キャッシュした poster から重心だけ再計算する (下の else 側)
                 need_poster_recalc = (
                     cache_poster is None
                     or cache_levels != params["levels"]
                     or cache_img_id != id(self.proc_img)
-                    or cache_neck != params.get("neck_separation")
-                    or cache_shape != params.get("shape_complexity")
                 )
 
                 # 自動モードでは通常通り重い処理を行う
                 if self.auto_update_mode:
+                    if (
+                        need_poster_recalc
+                        and allow_async
+                        and cache_poster is not None
+                        and cache_img_id == id(self.proc_img)
+                        and not self._has_poster(params["levels"])
+                        and not self._poster_failed(params["levels"])
+                    ):
+                        # 表示中の結果はそのまま残し、K-means の完了後 (_on_poster_ready) に描き直す
+                        self._compute_poster_async(params["levels"])
+                        return
                     if need_poster_recalc:
-                        poster = kmeans_posterize(self.proc_img, params["levels"])
-                        centroids = self.centroid_processor.get_centroids(params, poster=poster)
+                        poster, palette, labels = self._get_poster(params["levels"])
+                        centroids = self.centroid_processor.get_centroids(params, poster=poster, palette=palette, labels=labels)
                         areas_now = getattr(self.centroid_processor, 'last_component_areas', [])
                         boundary_mask_now = getattr(self.centroid_processor, 'last_boundary_mask', None)
                         self._cache.update({
@@ -3380,6 +3507,8 @@ class CentroidFinderWindow(QMainWindow):
                             "neck_separation": params.get("neck_separation"),
                             "shape_complexity": params.get("shape_complexity"),
                             "poster": poster,
+                            "palette": palette,
+                            "labels": labels,
                             "centroids": centroids,
                             "areas": areas_now,
                             "boundary_mask": boundary_mask_now,
@@ -3396,11 +3525,12 @@ class CentroidFinderWindow(QMainWindow):
                             or cache_shape != params.get("shape_complexity")
                         ):
                             try:
-                                centroids = self.centroid_processor.get_centroids(params, poster=poster)
+                                centroids = self.centroid_processor.get_centroids(params, poster=poster, palette=self._cache.get("palette"), labels=self._cache.get("labels"))
                                 areas_now = getattr(self.centroid_processor, 'last_component_areas', [])
                                 boundary_mask_now = getattr(self.centroid_processor, 'last_boundary_mask', None)
                                 # update cached params and centroids (keep poster and img_id/levels)
                                 self._cache.update({
+                                    "min_area": params["min_area"],
                                     "trim_px": params["trim_px"],
                                     "max_area": params.get("max_area"),
                                     "neck_separation": params.get("neck_separation"),
@@ -3422,7 +3552,7 @@ class CentroidFinderWindow(QMainWindow):
                         poster = cache_poster
                         # Use centroid_processor to recompute centroids from cached poster with current params
                         try:
-                            centroids = self.centroid_processor.get_centroids(params, poster=poster)
+                            centroids = self.centroid_processor.get_centroids(params, poster=poster, palette=self._cache.get("palette"), labels=self._cache.get("labels"))
                             areas_now = getattr(self.centroid_processor, 'last_component_areas', [])
                             boundary_mask_now = getattr(self.centroid_processor, 'last_boundary_mask', None)
                             # Keep cache in sync for histogram/boundary reuse
@@ -3443,8 +3573,8 @@ class CentroidFinderWindow(QMainWindow):
                                 boundary_mask_now = self._cache.get("boundary_mask")
                     else:
                         # キャッシュが無ければフォールバックで軽めに計算（呼び出し元でエラーは吸収）
-                        poster = kmeans_posterize(self.proc_img, params["levels"])
-                        centroids = self.centroid_processor.get_centroids(params, poster=poster)
+                        poster, palette, labels = self._get_poster(params["levels"])
+                        centroids = self.centroid_processor.get_centroids(params, poster=poster, palette=palette, labels=labels)
                         areas_now = getattr(self.centroid_processor, 'last_component_areas', [])
                         boundary_mask_now = getattr(self.centroid_processor, 'last_boundary_mask', None)
                         self._cache.update({
@@ -3456,30 +3586,28 @@ class CentroidFinderWindow(QMainWindow):
                             "neck_separation": params.get("neck_separation"),
                             "shape_complexity": params.get("shape_complexity"),
                             "poster": poster,
+                            "palette": palette,
+                            "labels": labels,
                             "centroids": centroids,
                             "areas": areas_now,
                             "boundary_mask": boundary_mask_now,
                         })
-                # 表示用にポスター画像をフル解像度へ拡大
-                scale = 1.0 / self.scale_proc_to_full
-                if scale != 1.0:
-                    new_w = self.img_full.shape[1]
-                    new_h = self.img_full.shape[0]
-                    poster_full = cv2.resize(poster, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
-                    # Boundary のエッジ検出は最近傍で拡大したポスターを使う（線が太くなる原因を避ける）
-                    poster_edges_full = cv2.resize(poster, (new_w, new_h), interpolation=cv2.INTER_NEAREST)
-                else:
-                    poster_full = poster.copy()
-                    poster_edges_full = poster_full
                 # Overlay selection by mode: Original / Posterized (Mixed removed)
                 try:
                     overlay_mode = str(getattr(self, 'overlay_mode', 'Mixed')).lower()
                 except Exception:
                     overlay_mode = 'original'
+                # 表示用にポスター画像をフル解像度へ拡大 (poster が同じ間は前回の結果を使う)
+                # Original 表示では拡大したポスターは使わないので作らない
                 if overlay_mode == 'original':
-                    overlay_full = self.img_full.copy()
+                    overlay_src = self.img_full
+                else:
+                    overlay_src = self._get_poster_full(poster)
+                # 境界線を描き込むときだけバッファにコピーする (描かなければ読むだけなので元の配列のまま)
+                if self.show_boundaries:
+                    overlay_full = self._overlay_buffer_from(overlay_src)
                 else:
-                    overlay_full = poster_full.copy()
+                    overlay_full = overlay_src
 
                 try:
                     self._update_area_histogram(areas_now or [])
@@ -3494,40 +3622,26 @@ class CentroidFinderWindow(QMainWindow):
                             trim_px_full = int(params.get('trim_px', 0) or 0)
                         except Exception:
                             trim_px_full = 0
-                        try:
-                            # edge detection uses nearest-upscaled poster to avoid thick edges
-                            poster_fe = poster_edges_full.copy()
-                            if trim_px_full > 0:
-                                kf = int(trim_px_full)
-                                ker = np.ones((3, 3), np.uint8)
-                                out_full = np.zeros_like(poster_fe)
-                                unique_colors_full = np.unique(poster_fe.reshape(-1, 3), axis=0)
-                                for color in unique_colors_full:
-                                    mask = cv2.inRange(poster_fe, color, color)
-                                    mask_e = cv2.erode(mask, ker, iterations=kf)
-                                    out_full[mask_e == 255] = color
-                                edge_src = out_full
-                            else:
-                                edge_src = poster_fe
-                        except Exception:
-                            # fallback to poster_full if anything goes wrong
-                            try:
-                                edge_src = poster_full
-                            except Exception:
-                                edge_src = poster
-                        h, w = edge_src.shape[:2]
+                        h, w = overlay_full.shape[:2]
                         edge_mask = None
                         # Prefer using the post-filter boundary mask from centroid_processor if available.
+                        # (このときは下のフル解像度のエッジ検出用ポスターは作らない)
                         try:
                             if boundary_mask_now is not None:
-                                bm = boundary_mask_now
-                                if bm.shape[:2] != (h, w):
-                                    bm = cv2.resize(bm, (w, h), interpolation=cv2.INTER_NEAREST)
-                                edge_mask = bm.astype(np.uint8)
+                                edge_mask = self._get_full_boundary_mask(boundary_mask_now, (w, h))
                         except Exception:
                             edge_mask = None
 
                         if edge_mask is None:
+                            try:
+                                # edge detection uses nearest-upscaled poster to avoid thick edges
+                                edge_src = self._get_trimmed_edge_src(self._get_poster_edges_full(poster), trim_px_full)
+                            except Exception:
+                                # fallback to poster_full if anything goes wrong
+                                try:
+                                    edge_src = self._get_poster_full(poster)
+                                except Exception:
+                                    edge_src = poster
                             # Use Canny edge detector on nearest-upscaled poster to get crisp 1px edges.
                             try:
                                 gray = cv2.cvtColor(edge_src, cv2.COLOR_BGR2GRAY)
@@ -3535,20 +3649,12 @@ class CentroidFinderWindow(QMainWindow):
                                 edges = cv2.Canny(gray, 30, 100)
                                 # If Canny finds nothing (possible for some posters), fallback to diff-based
                                 if edges is None or not edges.any():
-                                    diff_h = np.any(edge_src[:, 1:, :] != edge_src[:, :-1, :], axis=2)
-                                    diff_v = np.any(edge_src[1:, :, :] != edge_src[:-1, :, :], axis=2)
-                                    edge_mask = np.zeros((h, w), dtype=np.uint8)
-                                    edge_mask[:, 1:][diff_h] = 255
-                                    edge_mask[1:, :][diff_v] = 255
+                                    edge_mask = color_boundary_mask(edge_src)
                                 else:
-                                    edge_mask = edges.copy()
+                                    edge_mask = edges
                             except Exception:
                                 # Fallback to difference-based detection if Canny fails
-                                diff_h = np.any(edge_src[:, 1:, :] != edge_src[:, :-1, :], axis=2)
-                                diff_v = np.any(edge_src[1:, :, :] != edge_src[:-1, :, :], axis=2)
-                                edge_mask = np.zeros((h, w), dtype=np.uint8)
-                                edge_mask[:, 1:][diff_h] = 255
-                                edge_mask[1:, :][diff_v] = 255
+                                edge_mask = color_boundary_mask(edge_src)
                         # 黒枠は不要 → スムージング（ガウシアン）で柔らかい白線へ
                         # trim_px_full==0 のときは、重なって太く見えるのを抑えるため
                         # - 事前に軽く erode して線を細くする
@@ -3560,16 +3666,9 @@ class CentroidFinderWindow(QMainWindow):
                             is_zero = False
                         # Keep boundaries thin: avoid blur (which makes them look thicker)
                         # Note: avoid aggressive erosion which can remove 1px edges.
-                        try:
-                            alpha = (edge_mask.astype(np.float32) / 255.0).reshape(h, w, 1)
-                            # Make edges clearly visible but not too heavy; slightly lower weight for trim=0 case
-                            alpha *= 0.60 if is_zero else 0.80
-                        except Exception:
-                            alpha = (edge_mask.astype(np.float32) / 255.0).reshape(h, w, 1)
                         # 白を alpha でブレンド
-                        overlay_full = overlay_full.astype(np.float32)
-                        overlay_full = overlay_full * (1.0 - alpha) + 255.0 * alpha
-                        overlay_full = np.clip(overlay_full, 0, 255).astype(np.uint8)
+                        # Make edges clearly visible but not too heavy; slightly lower weight for trim=0 case
+                        overlay_full = blend_edges_white(overlay_full, edge_mask, 0.60 if is_zero else 0.80)
                 except Exception:
                     # 万一の失敗時は何もしない（オーバーレイはそのまま）
                     pass
@@ -3580,45 +3679,6 @@ class CentroidFinderWindow(QMainWindow):
             # データ反映を先に行い、描画前に最新の点群を反映させる（灰色丸を即表示）
             self.centroids = centroids
 
-            # 真ん中の転置表へ raw X/Y を即反映（populate/refresh が遅延しても見えるように）
-            try:
-                rv = getattr(self, 'table_between', None)
-                if rv is not None:
-                    from qt_compat.QtWidgets import QTableWidgetItem
-                    # columns correspond to right-table row labels: X,Y,CalcX,CalcY,CalcZ
-                    need_cols = 5
-                    if rv.columnCount() != need_cols:
-                        rv.setColumnCount(need_cols)
-                        try:
-                            rv.setHorizontalHeaderLabels(STR.TABLE_RIGHT_ROW_LABELS)
-                        except Exception:
-                            pass
-                    need_rows = int(len(self.centroids)) if self.centroids is not None else 0
-                    if rv.rowCount() != need_rows:
-                        rv.setRowCount(need_rows)
-                        try:
-                            rv.setVerticalHeaderLabels([str(i + 1) for i in range(need_rows)])
-                        except Exception:
-                            pass
-                    for i, c in enumerate(self.centroids or []):
-                        try:
-                            _, x, y = c
-                            sx = str(int(round(x)))
-                            sy = str(int(round(y)))
-                            itx = rv.item(i, 0)
-                            if itx is None:
-                                itx = QTableWidgetItem("")
-                                rv.setItem(i, 0, itx)
-                            ity = rv.item(i, 1)
-                            if ity is None:
-                                ity = QTableWidgetItem("")
-                                rv.setItem(i, 1, ity)
-                            itx.setText(sx)
-                            ity.setText(sy)
-                        except Exception:
-                            pass
-            except Exception:
-                pass
             # 選択インデックスが範囲外なら解除
             if self.selected_index is not None and not (0 <= self.selected_index < len(self.centroids)):
                 self.selected_index = None
@@ -3664,10 +3724,11 @@ class CentroidFinderWindow(QMainWindow):
                     except Exception:
                         app.quit()
 
-    def _apply_proc_zoom(self):
+    def _apply_proc_zoom(self, fast=False):
         # Simplified rendering: do not use virtual canvas or PatchWorker.
-        # Build a pixmap for the current overlay (or proc_img fallback) and then draw grid/rotation if needed.
-        source_img = self._last_overlay_full if self._last_overlay_full is not None else self.proc_img
+        # Build a pixmap for the current overlay and then draw grid/rotation if needed.
+        # fast=True はホイール操作中のプレビュー (最近傍補間)。操作が落ち着いたら fast=False で描き直す。
+        source_img = self._last_overlay_full
         if source_img is None:
             self.img_label_proc.clear()
             return
@@ -3682,7 +3743,7 @@ class CentroidFinderWindow(QMainWindow):
                 self.ref_points,
                 self.scale_proc_to_full,
                 colors=None,
-                interp_mode=self.interp_mode,
+                interp_mode='nearest' if fast else self.interp_mode,
             )
         except Exception:
             pm = None
@@ -3800,18 +3861,6 @@ class CentroidFinderWindow(QMainWindow):
             except Exception:
                 return None
 
-        # Build pixmap from the full overlay and display it directly
-        pm, (off_x, off_y), (new_w, new_h) = build_zoomed_canvas(
-            self._last_overlay_full,
-            self.proc_zoom,
-            self.view_padding,
-            self.centroids,
-            self.selected_index,
-            self.ref_points,
-            self.scale_proc_to_full,
-            colors=None,
-            interp_mode=self.interp_mode,
-        )
         try:
             # Compute display_scale from actual drawn pixels so full<->display mapping stays consistent
             pad = int(self.view_padding)
@@ -3826,6 +3875,8 @@ class CentroidFinderWindow(QMainWindow):
             except Exception:
                 self._display_scale = 1.0
             self._display_offset = (off_x, off_y)
+        # マウス移動ごとの座標変換で使う逆数 (表示倍率が変わるここでだけ計算する)
+        self._inv_display_scale = 1.0 / max(0.0001, self._display_scale)
         if pm is None:
             self.img_label_proc.clear()
             return
@@ -4013,8 +4064,10 @@ class CentroidFinderWindow(QMainWindow):
                         from qt_compat.QtGui import QPixmap, QPainter, QPen, QColor
                         import math
                         
-                        # Create a copy to draw grid on
-                        pm2 = QPixmap(pm)
+                        # pm は build_zoomed_canvas が呼び出しごとに確保したキャンバスで、他と画素を共有しない
+                        # (_compose_canvas 参照)。なのでコピーせずそのまま描き込む
+                        # (QPixmap(pm) だと QPainter の時点でキャンバス全体の複製が走る)
+                        pm2 = pm
                         p = QPainter(pm2)
                         
                         pad = int(self.view_padding)
@@ -4083,6 +4136,12 @@ class CentroidFinderWindow(QMainWindow):
                             pass
                     except Exception as e:
                         self._dbg(f"Image grid drawing failed: {e}")
+                        # pm に直接描いているので、途中で失敗したら開いたままの painter を閉じる
+                        try:
+                            if p.isActive():
+                                p.end()
+                        except Exception:
+                            pass
                         # fallback: reuse last successful grid pixmap if available
                         try:
                             if getattr(self, '_last_pm_image_grid', None) is not None:
@@ -4135,54 +4194,6 @@ class CentroidFinderWindow(QMainWindow):
         label_pos_in_vp = self.img_label_proc.pos()  # QPoint (相対: viewport)
         return QPoint(pos.x() - label_pos_in_vp.x(), pos.y() - label_pos_in_vp.y())
 
-    def _cleanup_threads(self):
-        # Cancel and wait for any running patch worker to avoid QThread destroy errors
-        try:
-            prev = getattr(self, '_patch_worker', None)
-            if prev is not None:
-                try:
-                    prev.cancel()
-                except Exception:
-                    pass
-                try:
-                    # wait briefly for thread to exit
-                    prev.wait(1000)
-                except Exception:
-                    pass
-        except Exception:
-            pass
-
-    def _on_patch_ready(self, patch_array, left_label, top_label, request_id):
-        # Only apply if request_id matches latest
-        try:
-            if request_id != getattr(self, '_patch_request_id', None):
-                return
-            if patch_array is None:
-                return
-            # convert to QPixmap and composite over base pixmap
-            try:
-                pm = QPixmap(self._display_pm_base)
-                # If patch_array size != viewport size, resize it to viewport to fill region
-                vp = self.proc_scroll.viewport()
-                tgt_w = vp.width()
-                tgt_h = vp.height()
-                if patch_array.shape[1] != tgt_w or patch_array.shape[0] != tgt_h:
-                    try:
-                        patch_resized = cv2.resize(patch_array, (max(1, tgt_w), max(1, tgt_h)), interpolation=cv2.INTER_LINEAR)
-                    except Exception:
-                        patch_resized = patch_array
-                else:
-                    patch_resized = patch_array
-                painter = QPainter(pm)
-                painter.drawPixmap(left_label, top_label, cvimg_to_qpixmap(patch_resized))
-                painter.end()
-                self._display_pm_base = pm
-                self.img_label_proc.setPixmap(pm)
-            except Exception:
-                pass
-        except Exception:
-            pass
-
     def _label_pos_to_viewport_pos(self, pos):
         # ラベル座標をビューポート座標へ変換
         if self.proc_scroll is None:
@@ -4208,56 +4219,6 @@ class CentroidFinderWindow(QMainWindow):
         hsb.setValue(max(hsb.minimum(), min(hsb.maximum(), int(round(sx)))))
         vsb.setValue(max(vsb.minimum(), min(vsb.maximum(), int(round(sy)))))
 
-    def _start_kinetic(self, vx, vy):
-        # 慣性スクロール開始（vx,vy は px/秒、スクロール方向の速度）
-        self._kinetic_vx = float(vx)
-        self._kinetic_vy = float(vy)
-        self._kinetic_last_t = monotonic()
-        if not self._kinetic_timer.isActive():
-            self._kinetic_timer.start()
-
-    def _stop_kinetic(self):
-        self._kinetic_timer.stop()
-        self._kinetic_vx = 0.0
-        self._kinetic_vy = 0.0
-
-    def _on_kinetic_tick(self):
-        # 慣性スクロールの更新
-        t = monotonic()
-        dt = max(0.0, t - self._kinetic_last_t)
-        self._kinetic_last_t = t
-        if dt <= 0.0:
-            return
-        hsb = self.proc_scroll.horizontalScrollBar()
-        vsb = self.proc_scroll.verticalScrollBar()
-        # 現在位置更新
-        sx = hsb.value() + self._kinetic_vx * dt
-        sy = vsb.value() + self._kinetic_vy * dt
-        # 端でのバウンド抑制：はみ出す方向の速度は殺す
-        hit_edge_x = False
-        hit_edge_y = False
-        if sx <= hsb.minimum():
-            sx = hsb.minimum(); hit_edge_x = True
-        elif sx >= hsb.maximum():
-            sx = hsb.maximum(); hit_edge_x = True
-        if sy <= vsb.minimum():
-            sy = vsb.minimum(); hit_edge_y = True
-        elif sy >= vsb.maximum():
-            sy = vsb.maximum(); hit_edge_y = True
-        self._set_scroll(sx, sy)
-        # 減衰（指数的）
-        decay = 0.92  # 1ティックごと
-        self._kinetic_vx *= decay
-        self._kinetic_vy *= decay
-        # エッジ命中で該当軸の速度を強制減衰
-        if hit_edge_x:
-            self._kinetic_vx *= 0.3
-        if hit_edge_y:
-            self._kinetic_vy *= 0.3
-        # 終了条件
-        if abs(self._kinetic_vx) < 5 and abs(self._kinetic_vy) < 5:
-            self._stop_kinetic()
-
     # テーブル構築関連は tables.py に移動
 
     def _on_ref_table_current_changed(self, curRow, curCol, prevRow, prevCol):
@@ -4266,6 +4227,7 @@ class CentroidFinderWindow(QMainWindow):
         self.ref_selected_index = curCol
         # 参照選択の変更では描画更新は不要
 
+    @pyqtSlot(int, int, int, int)
     def _on_ref_view_current_changed(self, curRow, curCol, prevRow, prevCol):
         """Selection change in transposed ref view.
 
@@ -4281,6 +4243,7 @@ class CentroidFinderWindow(QMainWindow):
         except Exception:
             pass
 
+    @pyqtSlot()
     def _on_add_ref_point(self):
         # キャンセルモード中なら、ピックモードを終了
         if self.pick_mode == 'add':
@@ -4293,11 +4256,7 @@ class CentroidFinderWindow(QMainWindow):
             self._flush_ref_view()
         except Exception:
             pass
-        target = None
-        for i, pt in enumerate(self.ref_points):
-            if pt is None:
-                target = i
-                break
+        target = self._first_free_ref_index()
         if target is None:
             # 既存選択が有効ならそれを使う
             target = self.ref_selected_index if 0 <= self.ref_selected_index < len(self.ref_points) else 0
@@ -4326,6 +4285,7 @@ class CentroidFinderWindow(QMainWindow):
         # カーソルを画像中心にジャンプ
         self._move_cursor_to_image_center()
 
+    @pyqtSlot()
     def _on_update_xy(self):
         # Toggle pick-mode（Update）: 押し直すとキャンセル
         if self.pick_mode == 'update':
@@ -4378,6 +4338,95 @@ class CentroidFinderWindow(QMainWindow):
                 # 十字線を即時表示
                 self._draw_crosshair(local_pt)
 
+    def _first_free_ref_index(self):
+        """座標が未設定の Ref 列のうち最小の番号を返す (無ければ None)。
+
+        _ref_free は空きになった列番号を積むだけのヒープで、先頭が既に
+        埋まっていればここで取り除く (列を埋めるたびにヒープを直さない)。
+        """
+        free = self._ref_free
+        while free:
+            i = free[0]
+            if 0 <= i < len(self.ref_points) and self.ref_points[i] is None:
+                return i
+            heapq.heappop(free)
+        return None
+
+    def _ref_in_fit(self, idx):
+        """idx の Ref がフィッティングに使われる (座標があり Obs. X/Y/Z が全て数値) なら True。
+
+        populate_tables と同じ条件。使われない Ref の変更は Calc・残差のセルに影響しない。
+        """
+        try:
+            pt = self.ref_points[idx] if 0 <= idx < len(self.ref_points) else None
+            obs = self.ref_obs[idx] if 0 <= idx < len(self.ref_obs) else None
+            if pt is None or not obs:
+                return False
+            for key in ('x', 'y', 'z'):
+                v = str(obs.get(key, "")).strip()
+                if v == "":
+                    return False
+                float(v)
+            return True
+        except Exception:
+            return False
+
+    def _update_ref_column(self, idx):
+        """Ref idx の X/Y/Obs セルだけを table_ref と table_ref_view に書き込む。
+
+        フィッティングに関わらない Ref の変更で、表全体を作り直す代わりに使う。
+        書き込むセルが揃っていない (列の追加などで表の形が変わる) ときは何もせず False を返す。
+
+        Returns:
+            書き込んだら True
+        """
+        t = getattr(self, 'table_ref', None)
+        rv = getattr(self, 'table_ref_view', None)
+        if t is None or rv is None:
+            return False
+        idx = int(idx)
+        if not (0 <= idx < self.visible_ref_cols):
+            return False
+        pt = self.ref_points[idx] if idx < len(self.ref_points) else None
+        obs = self.ref_obs[idx] if idx < len(self.ref_obs) else None
+        obs = obs or {}
+        texts = [
+            "" if pt is None else str(int(round(pt[0]))),
+            "" if pt is None else str(int(round(pt[1]))),
+            obs.get("x", ""),
+            obs.get("y", ""),
+            obs.get("z", ""),
+        ]
+        # canonical: table_ref の 2〜6 行目、転置: table_ref_view の (idx + 2) 行の 0〜4 列
+        src_row_offset = 2
+        header_rows = 2
+        src_items = [t.item(src_row_offset + k, idx) for k in range(len(texts))]
+        view_items = [rv.item(idx + header_rows, k) for k in range(len(texts))]
+        if any(it is None for it in src_items) or any(it is None for it in view_items):
+            return False
+        # 前回の転置ビューが最新だったなら、この列を書き換えた後も最新のまま
+        last = self._transposed_key
+        try:
+            t.blockSignals(True)
+            rv.blockSignals(True)
+            for it, txt in zip(src_items + view_items, texts + texts):
+                if it.text() != txt:
+                    it.setText(txt)
+        finally:
+            t.blockSignals(False)
+            rv.blockSignals(False)
+        # populate 後と同じく疑似ヘッダーを張り直す (データセルと重なる位置がある)
+        try:
+            self._setup_pseudo_headers_ref(t)
+        except Exception:
+            pass
+        if last is not None and not getattr(self, '_pending_ref_view_refresh', False):
+            key = self._transposed_data_key()
+            if last[0] is key[0] and last[1][2:] == key[1][2:]:
+                self._transposed_key = key
+        return True
+
+    @pyqtSlot()
     def _on_clear_ref(self):
         # 選択中のRef列をクリア
         if not (0 <= self.ref_selected_index < len(self.ref_points)):
@@ -4389,12 +4438,25 @@ class CentroidFinderWindow(QMainWindow):
             pass
 
         idx = int(self.ref_selected_index)
+        # フィッティングに使われていなかった Ref なら、Calc・残差は変わらない
+        affects_fit = self._ref_in_fit(idx)
+        if self.ref_points[idx] is not None:
+            heapq.heappush(self._ref_free, idx)
         self.ref_points[idx] = None
+        if len(self._ref_free) > 2 * len(self.ref_points):
+            # 埋まった列の古い番号が溜まったら作り直す (昇順リストはそのままヒープ)
+            self._ref_free = [i for i, pt in enumerate(self.ref_points) if pt is None]
         try:
             if 0 <= idx < len(self.ref_obs):
                 self.ref_obs[idx] = {"x": "", "y": "", "z": ""}
         except Exception:
             pass
+        if not affects_fit and self._update_ref_column(idx):
+            try:
+                self._apply_proc_zoom()
+            except Exception:
+                pass
+            return
         # テーブル更新と再描画
         try:
             self._safe_populate_tables(self.table_ref, self.table, self.ref_points, self.ref_obs, self.centroids, self.selected_index, self.ref_selected_index, flip_mode=self.flip_mode, visible_ref_cols=self.visible_ref_cols)
@@ -4483,6 +4545,8 @@ class CentroidFinderWindow(QMainWindow):
         else:
             params = self._get_params()
             poster = None
+            palette = None
+            labels = None
             if (
                 self._cache.get("poster") is not None
                 and self._cache.get("img_id") == id(self.proc_img)
@@ -4491,7 +4555,9 @@ class CentroidFinderWindow(QMainWindow):
                 and self._cache.get("trim_px") == params.get("trim_px")
             ):
                 poster = self._cache.get("poster")
-            centroids = self.centroid_processor.get_centroids(params, poster=poster)
+                palette = self._cache.get("palette")
+                labels = self._cache.get("labels")
+            centroids = self.centroid_processor.get_centroids(params, poster=poster, palette=palette, labels=labels)
         dt_str = datetime.now().strftime("%Y%m%d_%H%M%S")
         default_name = f"{STR.EXPORT_FILENAME_PREFIX}{dt_str}.txt"
 
@@ -4573,6 +4639,7 @@ class CentroidFinderWindow(QMainWindow):
             self.selected_index = idx
             self.schedule_update(force=True)
 
+    @pyqtSlot(int, int, int, int)
     def _on_table_between_current_changed(self, curRow, curCol, prevRow, prevCol):
         # transposed view row maps to original table column (selected centroid index)
         try:
@@ -4612,10 +4679,12 @@ class CentroidFinderWindow(QMainWindow):
             return None
         img_w, img_h = self._img_base_size
         # use actual display_scale (display pixels per full-image pixel)
-        z = max(0.0001, float(getattr(self, '_display_scale', max(0.1, float(self.proc_zoom)))))
+        inv = self._inv_display_scale
+        if inv is None:
+            inv = 1.0 / max(0.1, float(self.proc_zoom))
         off_x, off_y = self._display_offset
-        x_full = (pos.x() - off_x) / z
-        y_full = (pos.y() - off_y) / z
+        x_full = (pos.x() - off_x) * inv
+        y_full = (pos.y() - off_y) * inv
         if not (0 <= x_full <= img_w and 0 <= y_full <= img_h):
             return None
         return x_full, y_full
@@ -4624,17 +4693,26 @@ class CentroidFinderWindow(QMainWindow):
         # フル画像座標からラベル座標へ（ズームのみ）
         if self._img_base_size is None:
             return None
-        z = max(0.0001, float(getattr(self, '_display_scale', max(0.1, float(self.proc_zoom)))))
+        # _inv_display_scale と同じ箇所で設定される (未設定なら proc_zoom)
+        z = self._display_scale if self._inv_display_scale is not None else max(0.1, float(self.proc_zoom))
         off_x, off_y = self._display_offset
         return x_full * z + off_x, y_full * z + off_y
 
+    def _on_table_hrange_changed(self, _min, _max):
+        # 横スクロール状態が変わったら高さも再調整（右テーブル）。
+        # リサイズ中は何度も呼ばれるので、高さを左右する値が変わっていなければ何もしない
+        key = tables_height_key(self.table_ref, self.table)
+        if key is not None and key == getattr(self, '_tables_h_key', None):
+            return
+        self._tables_h_key = key
+        fix_tables_height(self.table_ref, self.table)
+
     def _draw_crosshair(self, pos_label):
         # ピックモード中に、画像端まで届く白い＋線（黒縁）を描画
         if self._display_pm_base is None:
             return
-        pm2 = draw_crosshair(self._display_pm_base, self._display_offset, self._display_img_size, pos_label)
-        if pm2 is not None:
-            self.img_label_proc.setPixmap(pm2)
+        # ベース Pixmap はそのままにして、十字線はラベルの paintEvent で上描きする
+        self.img_label_proc.set_crosshair(pos_label, self._display_offset, self._display_img_size)
 
     # ルーペ更新は不要
 
@@ -4715,6 +4793,7 @@ class CentroidFinderWindow(QMainWindow):
     def _end_pick_mode(self):
         self.pick_mode = None
         self.pick_ref_index = None
+        self.img_label_proc.clear_crosshair()
         # 通常は手のカーソル
         self.img_label_proc.setCursor(QCursor(Qt.OpenHandCursor))
         # ルーペは存在しない
@@ -4838,11 +4917,16 @@ class CentroidFinderWindow(QMainWindow):
                     # 新しく追加された列が表示範囲外なら可視列を拡張
                     if (idx + 1) > self.visible_ref_cols:
                         self.visible_ref_cols = min(len(self.ref_points), idx + 1)
-                    self._safe_populate_tables(self.table_ref, self.table, self.ref_points, self.ref_obs, self.centroids, self.selected_index, self.ref_selected_index, flip_mode=self.flip_mode, visible_ref_cols=self.visible_ref_cols)
-                    try:
-                        self._refresh_transposed_views()
-                    except Exception:
-                        pass
+                        targeted = False
+                    else:
+                        # フィッティングに使われない Ref (Obs 未入力など) は座標セルだけ書き換えれば済む
+                        targeted = not self._ref_in_fit(idx) and self._update_ref_column(idx)
+                    if not targeted:
+                        self._safe_populate_tables(self.table_ref, self.table, self.ref_points, self.ref_obs, self.centroids, self.selected_index, self.ref_selected_index, flip_mode=self.flip_mode, visible_ref_cols=self.visible_ref_cols)
+                        try:
+                            self._refresh_transposed_views()
+                        except Exception:
+                            pass
                     # 要望: Add で点を指定したら即赤点を描画し、Addモードを抜ける
                     try:
                         self._apply_proc_zoom()  # ref_points を反映して再描画（赤点が即時出る）
@@ -4852,6 +4936,7 @@ class CentroidFinderWindow(QMainWindow):
                     if self.pick_mode in ('add', 'update'):
                         self._end_pick_mode()
 
+    @pyqtSlot(QTableWidgetItem)
     def _on_ref_item_changed(self, item):
         # 左テーブル（Ref）の Obs.* 行（2,3,4行目）入力を半角へ正規化し、内部配列に反映
         row = item.row()
@@ -4861,7 +4946,7 @@ class CentroidFinderWindow(QMainWindow):
             return
         text = item.text() or ""
         # 全角を半角へ（英数記号）
-        normalized = unicodedata.normalize('NFKC', text)
+        normalized = _nfkc(text)
         if normalized != text:
             # ループ防止のため一旦シグナル停止
             self.table_ref.blockSignals(True)
@@ -4871,6 +4956,8 @@ class CentroidFinderWindow(QMainWindow):
                 self.table_ref.blockSignals(False)
         key = 'x' if row == 4 else ('y' if row == 5 else 'z')
         if 0 <= col < len(self.ref_obs):
+            if self.ref_obs[col].get(key, "") != normalized:
+                self._ref_recompute_dirty = True
             self.ref_obs[col][key] = normalized
 
         # 右表の Calc.* 更新はイベントループに回して commit/closeEditor と競合させない
@@ -4879,6 +4966,7 @@ class CentroidFinderWindow(QMainWindow):
         except Exception:
             pass
 
+    @pyqtSlot(QTableWidgetItem)
     def _on_ref_view_item_changed(self, item):
         # Map edits in the transposed view back to the underlying `self.table_ref`.
         try:
@@ -4904,9 +4992,12 @@ class CentroidFinderWindow(QMainWindow):
                     txt = item.text() if item.text() is not None else ""
                     # normalize full-width -> half-width (keep consistent with _on_ref_item_changed)
                     try:
-                        normalized = unicodedata.normalize('NFKC', txt)
+                        normalized = _nfkc(txt)
                     except Exception:
                         normalized = txt
+                    if normalized != txt:
+                        # 正規化した表示に置き換えるため再構築が要る
+                        self._ref_recompute_dirty = True
                     txt = normalized
                     # While we mirror the edit into the canonical table, block its signals too.
                     # Otherwise _on_ref_item_changed may fire synchronously (re-entrant) while
@@ -4934,6 +5025,8 @@ class CentroidFinderWindow(QMainWindow):
                         obs_rows = (src_row_offset + 2, src_row_offset + 3, src_row_offset + 4)
                         if src_r in obs_rows and 0 <= src_c < len(self.ref_obs):
                             key = 'x' if src_r == obs_rows[0] else ('y' if src_r == obs_rows[1] else 'z')
+                            if self.ref_obs[src_c].get(key, "") != txt:
+                                self._ref_recompute_dirty = True
                             self.ref_obs[src_c][key] = txt
                     except Exception:
                         pass
@@ -4944,6 +5037,8 @@ class CentroidFinderWindow(QMainWindow):
                         pass
         except Exception:
             pass
+        # 編集されたセルの表示は元データと食い違い得るので、次の再構築は必ず行う
+        self._mark_transposed_dirty()
         # Recompute after any transposed-view edit (coalesced)
         try:
             self._defer_recompute_after_ref_edit()
@@ -5103,7 +5198,7 @@ class CentroidFinderWindow(QMainWindow):
                         it = rv.item(r, c)
                         txt = it.text() if it is not None else ""
                         try:
-                            txt = unicodedata.normalize('NFKC', txt)
+                            txt = _nfkc(txt)
                         except Exception:
                             pass
                         # sanitize accidental header tokens
@@ -5137,7 +5232,8 @@ class CentroidFinderWindow(QMainWindow):
                             if src_item is None:
                                 src_item = QTableWidgetItem(txt)
                                 self.table_ref.setItem(src_r, src_c, src_item)
-                            else:
+                            elif src_item.text() != txt:
+                                # 変わっていないセルは書き換えない (blockSignals してもモデルの dataChanged は出る)
                                 src_item.setText(txt)
                         except Exception:
                             pass
@@ -5337,6 +5433,7 @@ class CentroidFinderWindow(QMainWindow):
                     # transposed views using stale data. Refresh again now to ensure X/Y and
                     # Calc tables reflect the latest population.
                     try:
+                        self._mark_transposed_dirty()
                         self._refresh_transposed_views()
                     except Exception:
                         pass
@@ -5367,8 +5464,37 @@ class CentroidFinderWindow(QMainWindow):
         except Exception:
             pass
 
+    def _transposed_data_key(self):
+        """転置ビューの内容を決める元データ (populate_tables の引数) のスナップショットを返す。
+
+        centroids は作り直されるだけで書き換えられないので参照で比べ、
+        ref_obs の dict はその場で書き換えられるので repr で写し取る。
+        """
+        return (
+            self.centroids,
+            (repr(self.ref_points), repr(self.ref_obs), self.selected_index,
+             self.ref_selected_index, self.flip_mode, self.visible_ref_cols),
+        )
+
+    def _mark_transposed_dirty(self):
+        """元データが同じでも、次の _refresh_transposed_views で転置ビューを作り直させる。"""
+        self._transposed_key = None
+
     def _refresh_transposed_views(self):
         # Create/update transposed copies of `self.table_ref` and `self.table`.
+        try:
+            # 前回作り直したときと元データが同じなら、転置ビューの中身も同じなので何もしない
+            key = self._transposed_data_key()
+            last = self._transposed_key
+            if (
+                last is not None
+                and last[0] is key[0]
+                and last[1] == key[1]
+                and not getattr(self, '_pending_ref_view_refresh', False)
+            ):
+                return
+        except Exception:
+            key = None
         try:
             header_rows = 2
             ref_src_row_offset = 2  # canonical table_ref has 2 pseudo-header rows
@@ -5542,7 +5668,7 @@ class CentroidFinderWindow(QMainWindow):
                         span = max(1, min(int(col_span), int(tbl.columnCount() - col_start)))
                         it = QTableWidgetItem(str(label))
                         try:
-                            it.setTextAlignment(_Qt.AlignLeft | _Qt.AlignVCenter)
+                            it.setTextAlignment(ALIGN_LEFT_VCENTER)
                             f = it.font(); f.setBold(True); it.setFont(f)
                             it.setBackground(QColor("lightgray"))
                             it.setForeground(QColor("black"))
@@ -5561,7 +5687,7 @@ class CentroidFinderWindow(QMainWindow):
                             break
                         it = QTableWidgetItem(str(label))
                         try:
-                            it.setTextAlignment(_Qt.AlignHCenter | _Qt.AlignVCenter)
+                            it.setTextAlignment(ALIGN_HVCENTER)
                             f = it.font(); f.setBold(True); it.setFont(f)
                             it.setBackground(QColor("lightgray"))
                             it.setForeground(QColor("black"))
@@ -5599,6 +5725,7 @@ class CentroidFinderWindow(QMainWindow):
                     data_cols = max(0, int(src_row_count))
                     src_row_map = [ref_src_row_offset + i for i in range(data_cols)]
                     dst.blockSignals(True)
+                    dst.setUpdatesEnabled(False)
                     try:
                         try:
                             dst.clearSpans()
@@ -5628,6 +5755,12 @@ class CentroidFinderWindow(QMainWindow):
                         except Exception:
                             pass
 
+                        # セルの太字フォントと編集不可フラグはここで一度だけ作る
+                        # (Qt の enum 属性の参照やフォントの取得をセルごとに行わない)
+                        bold_font = QTableWidgetItem().font()
+                        bold_font.setBold(True)
+                        ro_flags = QTableWidgetItem().flags() & ~_Qt.ItemIsEditable
+
                         # Fill data (shifted down by header_rows)
                         for r in range(data_rows):
                             for c in range(data_cols):
@@ -5661,24 +5794,13 @@ class CentroidFinderWindow(QMainWindow):
                                 except Exception:
                                     txt = ""
                                 it = QTableWidgetItem(str(txt))
-                                try:
-                                    it.setTextAlignment(_Qt.AlignHCenter | _Qt.AlignVCenter)
-                                except Exception:
-                                    pass
+                                it.setTextAlignment(ALIGN_HVCENTER)
                                 # Make Stage columns (X/Y/Z) visually bold in the transposed/ref view
-                                try:
-                                    if c in (2, 3, 4):
-                                        f = it.font(); f.setBold(True); it.setFont(f)
-                                except Exception:
-                                    pass
                                 # Editability: only Obs columns (X/Y/Z) are editable
-                                try:
-                                    if c in (2, 3, 4):
-                                        pass
-                                    else:
-                                        it.setFlags(it.flags() & ~getattr(_Qt, 'ItemIsEditable', 0))
-                                except Exception:
-                                    pass
+                                if c in (2, 3, 4):
+                                    it.setFont(bold_font)
+                                else:
+                                    it.setFlags(ro_flags)
                                 dst.setItem(header_rows + r, c, it)
 
                         # Style the row-number gutter (vertical header): bold + readable gray
@@ -5717,9 +5839,12 @@ class CentroidFinderWindow(QMainWindow):
                             pass
                     finally:
                         dst.blockSignals(False)
+                        dst.setUpdatesEnabled(True)
+                        dst.viewport().update()
                 except Exception:
                     try:
                         dst.blockSignals(False)
+                        dst.setUpdatesEnabled(True)
                     except Exception:
                         pass
 
@@ -5744,6 +5869,7 @@ class CentroidFinderWindow(QMainWindow):
                     data_cols = base_cols + 1
                     src_row_map = [mid_src_row_offset + i for i in range(base_cols)]
                     dst.blockSignals(True)
+                    dst.setUpdatesEnabled(False)
                     try:
                         try:
                             dst.clearSpans()
@@ -5772,6 +5898,14 @@ class CentroidFinderWindow(QMainWindow):
                         except Exception:
                             pass
 
+                        # セルの太字フォント・編集不可フラグ・太字にする列はここで一度だけ決める
+                        bold_font = QTableWidgetItem().font()
+                        bold_font.setBold(True)
+                        ro_flags = QTableWidgetItem().flags() & ~_Qt.ItemIsEditable
+                        # Bold the leftmost Grp column values and Stage X/Y/Z columns for readability
+                        tmp_sub_labels = ["Lvl", "u", "v", "X", "Y", "Z"]
+                        bold_cols = {0} | {c for c, lbl in enumerate(tmp_sub_labels) if lbl in ("X", "Y", "Z")}
+
                         for r in range(data_rows):
                             for c in range(data_cols):
                                 try:
@@ -5790,29 +5924,11 @@ class CentroidFinderWindow(QMainWindow):
                                 except Exception:
                                     txt = ""
                                 it = QTableWidgetItem(str(txt))
-                                try:
-                                    it.setTextAlignment(_Qt.AlignHCenter | _Qt.AlignVCenter)
-                                except Exception:
-                                    pass
+                                it.setTextAlignment(ALIGN_HVCENTER)
                                 # All cells in this transposed view should be non-editable
-                                try:
-                                    it.setFlags(it.flags() & ~getattr(_Qt, 'ItemIsEditable', 0))
-                                except Exception:
-                                    pass
-                                # Bold the leftmost Grp column values
-                                try:
-                                    if c == 0:
-                                        f = it.font(); f.setBold(True); it.setFont(f)
-                                except Exception:
-                                    pass
-                                # Bold Stage X/Y/Z columns for readability
-                                try:
-                                    tmp_sub_labels = ["Lvl", "u", "v", "X", "Y", "Z"]
-                                    sub_lbl = tmp_sub_labels[c] if 0 <= c < len(tmp_sub_labels) else None
-                                    if sub_lbl in ("X", "Y", "Z"):
-                                        f = it.font(); f.setBold(True); it.setFont(f)
-                                except Exception:
-                                    pass
+                                it.setFlags(ro_flags)
+                                if c in bold_cols:
+                                    it.setFont(bold_font)
                                 dst.setItem(header_rows + r, c, it)
 
                         # Style the row-number gutter (vertical header): bold + readable gray
@@ -5844,9 +5960,12 @@ class CentroidFinderWindow(QMainWindow):
                             pass
                     finally:
                         dst.blockSignals(False)
+                        dst.setUpdatesEnabled(True)
+                        dst.viewport().update()
                 except Exception:
                     try:
                         dst.blockSignals(False)
+                        dst.setUpdatesEnabled(True)
                     except Exception:
                         pass
 
@@ -5860,6 +5979,7 @@ class CentroidFinderWindow(QMainWindow):
                     self._pending_ref_view_refresh = False
                 except Exception:
                     pass
+                self._transposed_key = key
 
             # update bottom/transposed table_between
             try:
@@ -5891,87 +6011,75 @@ class CentroidFinderWindow(QMainWindow):
         except Exception:
             pass
 
+    def _visible_column_widths(self, tbl):
+        """転置表示の表の列幅を計算する (表は変更しない)。
+
+        Args:
+            tbl: table_ref_view か table_between
+
+        Returns:
+            [(列番号, 幅 px), ...]。対象外の表なら空リスト
+        """
+        if tbl is None:
+            return []
+        cnt = tbl.columnCount()
+        if tbl is getattr(self, 'table_ref_view', None):
+            # すべて同じ幅に
+            return [(i, REF_VIEW_COLUMN_WIDTH) for i in range(cnt)]
+        if tbl is getattr(self, 'table_between', None):
+            # Match widths to the left transposed reference view when possible
+            ref_tbl = getattr(self, 'table_ref_view', None)
+            ref_cnt = ref_tbl.columnCount() if ref_tbl is not None else 0
+            return [(i, int(ref_tbl.columnWidth(i)) if i < ref_cnt else BETWEEN_EXTRA_COLUMN_WIDTH)
+                    for i in range(cnt)]
+        return []
+
+    def _apply_fixed_column_sizing(self, tbl):
+        """列幅を固定にし、新しく作られる列が最初から既定の幅になるようにする。
+
+        table_between の既定幅は BETWEEN_EXTRA_COLUMN_WIDTH のまま
+        (中央カラムの幅は列の追加時点の列幅から決まるので、ここを変えるとレイアウトが変わる)。
+        """
+        hdr = tbl.horizontalHeader()
+        hdr.setSectionResizeMode(QHeaderView.Fixed)
+        if tbl is getattr(self, 'table_between', None):
+            hdr.setDefaultSectionSize(BETWEEN_EXTRA_COLUMN_WIDTH)
+        else:
+            hdr.setDefaultSectionSize(REF_VIEW_COLUMN_WIDTH)
+
     def _shrink_visible_columns(self):
         """Apply fixed pixel widths to transposed tables so startup/更新後の幅が決まるようにする。
-        幅は必要に応じて変更してください（単位 px）。"""
+
+        列幅は _visible_column_widths で計算し、変わる列だけ設定する
+        (構築時に _apply_fixed_column_sizing 済みなので、通常は何も変わらない)。"""
         try:
-            # --- Left transposed reference view ---
-            tbl = getattr(self, 'table_ref_view', None)
-            if tbl is not None:
+            for tbl in (getattr(self, 'table_ref_view', None), getattr(self, 'table_between', None)):
+                if tbl is None:
+                    continue
                 try:
-                    hdr = tbl.horizontalHeader()
                     try:
-                        hdr.setSectionResizeMode(QHeaderView.Fixed)
+                        self._apply_fixed_column_sizing(tbl)
                     except Exception:
                         pass
-                    cnt = tbl.columnCount()
-                    if cnt > 0:
-                        # すべて同じ幅に
-                        widths_ref = [50] * cnt
-                        for i in range(cnt):
-                            w = int(widths_ref[i]) if i < len(widths_ref) else int(widths_ref[-1])
-                            try:
-                                tbl.setColumnWidth(i, max(8, w))
-                            except Exception:
-                                pass
+                    for i, w in self._visible_column_widths(tbl):
+                        w = max(8, int(w))
                         try:
-                            # center-align existing items
-                            for r in range(tbl.rowCount()):
-                                for c in range(tbl.columnCount()):
-                                    try:
-                                        it = tbl.item(r, c)
-                                        if it is not None:
-                                            it.setTextAlignment(Qt.AlignHCenter | Qt.AlignVCenter)
-                                    except Exception:
-                                        pass
-                        except Exception:
-                            pass
-                        try:
-                            hdr.setDefaultSectionSize(max(8, int(widths_ref[0])))
+                            if tbl.columnWidth(i) != w:
+                                tbl.setColumnWidth(i, w)
                         except Exception:
                             pass
-                except Exception:
-                    pass
-
-            # --- Middle transposed table_between (optional) ---
-            tbl2 = getattr(self, 'table_between', None)
-            if tbl2 is not None:
-                try:
-                    hdr2 = tbl2.horizontalHeader()
                     try:
-                        hdr2.setSectionResizeMode(QHeaderView.Fixed)
+                        # center-align existing items
+                        for r in range(tbl.rowCount()):
+                            for c in range(tbl.columnCount()):
+                                try:
+                                    it = tbl.item(r, c)
+                                    if it is not None:
+                                        it.setTextAlignment(ALIGN_HVCENTER)
+                                except Exception:
+                                    pass
                     except Exception:
                         pass
-                    cnt2 = tbl2.columnCount()
-                    if cnt2 > 0:
-                        # Match widths to the left transposed reference view when possible
-                        ref_tbl = getattr(self, 'table_ref_view', None)
-                        for i in range(cnt2):
-                            try:
-                                if ref_tbl is not None and i < ref_tbl.columnCount():
-                                    w = int(ref_tbl.columnWidth(i))
-                                else:
-                                    w = 40
-                                tbl2.setColumnWidth(i, max(8, w))
-                            except Exception:
-                                pass
-                        try:
-                            # center-align existing items in middle transposed
-                            for r in range(tbl2.rowCount()):
-                                for c in range(tbl2.columnCount()):
-                                    try:
-                                        it = tbl2.item(r, c)
-                                        if it is not None:
-                                            it.setTextAlignment(Qt.AlignHCenter | Qt.AlignVCenter)
-                                    except Exception:
-                                        pass
-                        except Exception:
-                            pass
-                        try:
-                            if ref_tbl is not None and ref_tbl.columnCount() > 0:
-                                hdr2.setDefaultSectionSize(max(8, 40))
-                        except Exception:
-                            pass
                 except Exception:
                     pass
 
@@ -6111,15 +6219,40 @@ class CentroidFinderWindow(QMainWindow):
                 except Exception:
                     pass
             # If we saved original pixmap, rescale it to exactly the width so it doesn't get clipped
+            # (同じ幅の縮小結果は使い回し、表示中と同じなら setPixmap もしない)
             try:
                 if getattr(self, '_left_top_pix', None) is not None:
-                    pm = self._left_top_pix.scaledToWidth(int(w), Qt.SmoothTransformation)
-                    img.setPixmap(pm)
+                    cached = getattr(self, '_left_top_scaled', None)
+                    if cached is not None and cached[0] == int(w):
+                        if img.pixmap().cacheKey() != cached[1].cacheKey():
+                            img.setPixmap(cached[1])
+                    else:
+                        # まず FastTransformation で即座に表示し、幅が落ち着いてから滑らかに描き直す
+                        img.setPixmap(self._left_top_pix.scaledToWidth(int(w), Qt.FastTransformation))
+                        if getattr(self, '_left_top_smooth_w', None) != int(w):
+                            self._left_top_smooth_w = int(w)
+                            QTimer.singleShot(150, self._apply_smooth_left_top_image)
             except Exception:
                 pass
         except Exception:
             pass
 
+    def _apply_smooth_left_top_image(self):
+        """_sync_left_top_image_width の仮表示 (FastTransformation) を滑らかな縮小に差し替える。"""
+        try:
+            w = getattr(self, '_left_top_smooth_w', None)
+            self._left_top_smooth_w = None
+            img = getattr(self, 'left_top_image', None)
+            pix = getattr(self, '_left_top_pix', None)
+            # 待っている間に幅が変わっていたら、その幅で予約し直した側に任せる
+            if w is None or img is None or pix is None or img.width() != w:
+                return
+            pm = pix.scaledToWidth(int(w), Qt.SmoothTransformation)
+            self._left_top_scaled = (int(w), pm)
+            img.setPixmap(pm)
+        except Exception:
+            pass
+
     def _on_toggle_auto_update(self, enabled: bool):
         """Toggle automatic poster/centroid recalculation.
 
@@ -6144,40 +6277,34 @@ class CentroidFinderWindow(QMainWindow):
             self.btn_recalc.setEnabled(False)
             params = self._get_params()
             # poster は重いので明示的に生成
-            poster = kmeans_posterize(self.proc_img, params["levels"])
-            centroids = self.centroid_processor.get_centroids(params, poster=poster)
+            poster, palette, labels = self._get_poster(params["levels"])
+            centroids = self.centroid_processor.get_centroids(params, poster=poster, palette=palette, labels=labels)
             self._cache.update({
                 "img_id": id(self.proc_img),
                 "levels": params["levels"],
                 "min_area": params["min_area"],
                 "trim_px": params["trim_px"],
                 "poster": poster,
+                "palette": palette,
+                "labels": labels,
                 "centroids": centroids,
             })
             # Rebuild overlay_full (boundaries/mask) from the newly generated poster
             try:
                 # poster is at proc_img resolution; upscale to full
-                scale = 1.0 / self.scale_proc_to_full if getattr(self, 'scale_proc_to_full', 1.0) != 0 else 1.0
-                if scale != 1.0 and self.img_full is not None:
-                    new_w = self.img_full.shape[1]
-                    new_h = self.img_full.shape[0]
-                    poster_full = cv2.resize(poster, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
-                    # Boundary edge detection should use nearest to prevent thick/blurred edges
-                    poster_edges_full = cv2.resize(poster, (new_w, new_h), interpolation=cv2.INTER_NEAREST)
-                else:
-                    poster_full = poster.copy()
-                    poster_edges_full = poster_full
+                poster_full = self._get_poster_full(poster)
                 # Overlay selection by mode: Original / Mixed(50:50) / Posterized
                 try:
                     overlay_mode = str(getattr(self, 'overlay_mode', 'Mixed')).lower()
                 except Exception:
                     overlay_mode = 'mixed'
                 if overlay_mode == 'original':
-                    overlay_full = self.img_full.copy()
+                    overlay_full = self._overlay_buffer_from(self.img_full)
                 elif overlay_mode == 'posterized':
-                    overlay_full = poster_full.copy()
+                    overlay_full = self._overlay_buffer_from(poster_full)
                 else:
-                    overlay_full = cv2.addWeighted(self.img_full, 0.5, poster_full, 0.5, 0)
+                    overlay_full = cv2.addWeighted(self.img_full, 0.5, poster_full, 0.5, 0,
+                                                   dst=self._overlay_buffer_like(self.img_full))
                 # draw boundaries if enabled
                 try:
                     if self.show_boundaries:
@@ -6187,27 +6314,10 @@ class CentroidFinderWindow(QMainWindow):
                         except Exception:
                             trim_px_full = 0
                         try:
-                            poster_fe = poster_edges_full.copy()
-                            if trim_px_full > 0:
-                                kf = int(trim_px_full)
-                                ker = np.ones((3, 3), np.uint8)
-                                out_full = np.zeros_like(poster_fe)
-                                unique_colors_full = np.unique(poster_fe.reshape(-1, 3), axis=0)
-                                for color in unique_colors_full:
-                                    mask = cv2.inRange(poster_fe, color, color)
-                                    mask_e = cv2.erode(mask, ker, iterations=kf)
-                                    out_full[mask_e == 255] = color
-                                edge_src = out_full
-                            else:
-                                edge_src = poster_fe
+                            edge_src = self._get_trimmed_edge_src(self._get_poster_edges_full(poster), trim_px_full)
                         except Exception:
                             edge_src = poster_full
-                        h, w = edge_src.shape[:2]
-                        diff_h = np.any(edge_src[:, 1:, :] != edge_src[:, :-1, :], axis=2)
-                        diff_v = np.any(edge_src[1:, :, :] != edge_src[:-1, :, :], axis=2)
-                        edge_mask = np.zeros((h, w), dtype=np.uint8)
-                        edge_mask[:, 1:][diff_h] = 255
-                        edge_mask[1:, :][diff_v] = 255
+                        edge_mask = color_boundary_mask(edge_src)
                         # trim_px_full==0 のときは見た目が太くなるため軽い erode と alpha 調整を行う
                         try:
                             is_zero = int(trim_px_full) == 0
@@ -6224,14 +6334,7 @@ class CentroidFinderWindow(QMainWindow):
                                     pass
                         except Exception:
                             pass
-                        try:
-                            alpha = (edge_mask.astype(np.float32) / 255.0).reshape(h, w, 1)
-                            alpha *= 0.30 if is_zero else 0.45
-                        except Exception:
-                            alpha = (edge_mask.astype(np.float32) / 255.0).reshape(h, w, 1)
-                        overlay_full = overlay_full.astype(np.float32)
-                        overlay_full = overlay_full * (1.0 - alpha) + 255.0 * alpha
-                        overlay_full = np.clip(overlay_full, 0, 255).astype(np.uint8)
+                        overlay_full = blend_edges_white(overlay_full, edge_mask, 0.30 if is_zero else 0.45)
                 except Exception:
                     pass
                 # store and display
@@ -6339,6 +6442,9 @@ class CentroidFinderWindow(QMainWindow):
                 except Exception:
                     pass
                 _set_bold(b)
+                # +/- ボタンは枠付きの標準の見た目のままにする (border-radius を足すと枠が消える)
+                if b.objectName() == "nudge":
+                    continue
                 try:
                     s = b.styleSheet() or ""
                     if "border-radius" not in s:
@@ -6715,7 +6821,7 @@ class CentroidFinderWindow(QMainWindow):
             for col_start, col_span, label in group_configs:
                 item = QTableWidgetItem(label)
                 try:
-                    item.setTextAlignment(Qt.AlignLeft | Qt.AlignVCenter)
+                    item.setTextAlignment(ALIGN_LEFT_VCENTER)
                     font = item.font()
                     font.setBold(True)
                     font.setPointSize(font.pointSize())
@@ -6737,7 +6843,7 @@ class CentroidFinderWindow(QMainWindow):
             for col, label in enumerate(sub_labels):
                 item = QTableWidgetItem(label)
                 try:
-                    item.setTextAlignment(Qt.AlignHCenter | Qt.AlignVCenter)
+                    item.setTextAlignment(ALIGN_HVCENTER)
                     font = item.font()
                     font.setBold(True)
                     item.setFont(font)
@@ -6789,7 +6895,7 @@ class CentroidFinderWindow(QMainWindow):
             for col_start, col_span, label in group_configs:
                 item = QTableWidgetItem(label)
                 try:
-                    item.setTextAlignment(Qt.AlignLeft | Qt.AlignVCenter)
+                    item.setTextAlignment(ALIGN_LEFT_VCENTER)
                     font = item.font()
                     font.setBold(True)
                     font.setPointSize(font.pointSize())
@@ -6809,7 +6915,7 @@ class CentroidFinderWindow(QMainWindow):
             for col, label in enumerate(sub_labels):
                 item = QTableWidgetItem(label)
                 try:
-                    item.setTextAlignment(Qt.AlignHCenter | Qt.AlignVCenter)
+                    item.setTextAlignment(ALIGN_HVCENTER)
                     font = item.font()
                     font.setBold(True)
                     item.setFont(font)
@@ -6921,9 +7027,9 @@ class CentroidFinderWindow(QMainWindow):
                                         if it is None:
                                             continue
                                         if r == 0:
-                                            it.setTextAlignment(Qt.AlignLeft | Qt.AlignVCenter)
+                                            it.setTextAlignment(ALIGN_LEFT_VCENTER)
                                         else:
-                                            it.setTextAlignment(Qt.AlignHCenter | Qt.AlignVCenter)
+                                            it.setTextAlignment(ALIGN_HVCENTER)
                                     except Exception:
                                         pass
                         except Exception:
@@ -6982,9 +7088,9 @@ class CentroidFinderWindow(QMainWindow):
                                         if it is None:
                                             continue
                                         if r == 0:
-                                            it.setTextAlignment(Qt.AlignLeft | Qt.AlignVCenter)
+                                            it.setTextAlignment(ALIGN_LEFT_VCENTER)
                                         else:
-                                            it.setTextAlignment(Qt.AlignHCenter | Qt.AlignVCenter)
+                                            it.setTextAlignment(ALIGN_HVCENTER)
                                     except Exception:
                                         pass
                         except Exception:
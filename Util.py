@@ -5,38 +5,132 @@
 汎用的な処理関数を定義する。
 """
 
+import hashlib
+import os
+
 import cv2
 import numpy as np
+from qt_compat.QtCore import Qt
 from qt_compat.QtGui import QPixmap, QImage
+from Config import CACHE_DIR
+
+
+# Qt 5.14+ は BGR の並びをそのまま受け取れる (無ければ RGB に変換して渡す)
+_FORMAT_BGR888 = getattr(QImage, "Format_BGR888", None)
+
+# cvimg_to_qpixmap の RGB 変換先バッファ (表示サイズが変わるまで使い回す)
+_rgb_buf = None
 
 
 def cvimg_to_qpixmap(img_bgr):
     """
     OpenCV BGR画像をQPixmapに変換。
 
+    QImage.Format_BGR888 があれば BGR のまま渡し、チャンネル入れ替えを省く。
+    古い Qt では使い回しのバッファに RGB 変換する。どちらも QImage は
+    配列をコピーせずに参照する (QPixmap.fromImage の時点でピクセルはコピーされる)。
+
     Args:
         img_bgr: BGR形式のNumPy配列
 
     Returns:
         QPixmapオブジェクト
     """
-    rgb = cv2.cvtColor(img_bgr, cv2.COLOR_BGR2RGB)
+    global _rgb_buf
+    if _FORMAT_BGR888 is not None:
+        src = np.ascontiguousarray(img_bgr)
+        h, w, ch = src.shape
+        qimg = QImage(src.data, w, h, ch * w, _FORMAT_BGR888)
+        return QPixmap.fromImage(qimg)
+    if _rgb_buf is None or _rgb_buf.shape != img_bgr.shape or _rgb_buf.dtype != img_bgr.dtype:
+        _rgb_buf = np.empty(img_bgr.shape, dtype=img_bgr.dtype)
+    rgb = cv2.cvtColor(img_bgr, cv2.COLOR_BGR2RGB, dst=_rgb_buf)
     h, w, ch = rgb.shape
     bytes_per_line = ch * w
     qimg = QImage(rgb.data, w, h, bytes_per_line, QImage.Format_RGB888)
     return QPixmap.fromImage(qimg)
 
 
-def kmeans_posterize(img_bgr, levels=2):
+def imread_color(path):
+    """
+    画像ファイルを BGR で読み込む (日本語パス対応のため imdecode を使う)。
+
+    ファイルはメモリマップして imdecode に渡し、圧縮データ全体を
+    ヒープにコピーしない (大きな画像で読み込みのピークメモリと時間が減る)。
+
+    Args:
+        path: 画像ファイルのパス
+
+    Returns:
+        BGR画像 (デコードできない場合は None。ファイルが無い・空のときは例外)
+    """
+    try:
+        buf = np.memmap(path, dtype=np.uint8, mode="r")
+    except (ValueError, OSError):
+        # 空ファイルなどメモリマップできない場合は通常の読み込み
+        buf = np.fromfile(path, dtype=np.uint8)
+    try:
+        return cv2.imdecode(buf, cv2.IMREAD_COLOR)
+    finally:
+        del buf
+
+
+def load_scaled_pixmap_cached(path, width, height, cache_dir=CACHE_DIR):
+    """
+    画像を (width, height) に収まるよう縮小した QPixmap を返す (ディスクキャッシュ付き)。
+
+    縮小結果は cache_dir に PNG で保存し、元画像のパス・更新時刻・サイズと
+    縮小後のサイズが同じなら次回からはそれを読むだけにする
+    (大きな画像のデコードと SmoothTransformation を起動のたびに行わない)。
+
+    Args:
+        path: 元画像のパス
+        width: 最大幅
+        height: 最大高さ
+        cache_dir: キャッシュの置き場所
+
+    Returns:
+        縮小した QPixmap (元画像を読めない場合は None)
+    """
+    cache_path = None
+    try:
+        st = os.stat(path)
+        key = f"{os.path.abspath(path)}|{st.st_mtime_ns}|{st.st_size}|{int(width)}x{int(height)}"
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+        cache_path = os.path.join(cache_dir, f"scaled_{digest}.png")
+        if os.path.exists(cache_path):
+            pm = QPixmap(cache_path)
+            if not pm.isNull():
+                return pm
+    except OSError:
+        pass
+    pm = QPixmap(path)
+    if pm.isNull():
+        return None
+    scaled = pm.scaled(int(width), int(height), Qt.KeepAspectRatio, Qt.SmoothTransformation)
+    if cache_path is not None:
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            scaled.save(cache_path, "PNG")
+        except Exception:
+            pass
+    return scaled
+
+
+def kmeans_posterize(img_bgr, levels=2, return_palette=False, return_labels=False):
     """
     K-meansクラスタリングによるポスタライズ処理。
 
     Args:
         img_bgr: 入力画像 (BGR)
         levels: 色数 (クラスタ数)
+        return_palette: True なら (poster, palette) を返す
+        return_labels: True なら (poster, palette, labels) を返す
 
     Returns:
         ポスタライズされた画像
+        (return_palette=True のときは K-means の代表色 (K, 3) uint8 も返す。
+        return_labels=True のときはさらに各画素のクラスタ番号 (H, W) int32 も返す)
     """
     Z = img_bgr.reshape((-1, 3)).astype(np.float32)
     K = max(1, int(levels))
@@ -48,8 +142,12 @@ def kmeans_posterize(img_bgr, levels=2):
         pass
     _, labels, centers = cv2.kmeans(Z, K, None, criteria, 10, cv2.KMEANS_PP_CENTERS)
     centers = np.uint8(centers)
-    res = centers[labels.flatten()]
+    res = centers[labels.ravel()]
     poster = res.reshape(img_bgr.shape)
+    if return_labels:
+        return poster, centers, labels.reshape(img_bgr.shape[:2])
+    if return_palette:
+        return poster, centers
     return poster
 
 
@@ -1,7 +1,8 @@
 from qt_compat.QtCore import Qt, QEvent, QPoint, QTimer, QObject
 from qt_compat.QtGui import QCursor
-from collections import deque
 from time import monotonic
+import numpy as np
+from rendering import uses_nearest
 
 
 def _evt_point(event):
@@ -25,6 +26,17 @@ def _evt_point(event):
     return QPoint(0, 0)
 
 
+# 慣性スクロールを止める速度 (px/秒)。16ms 間隔で 0.5px/フレーム未満なら
+# スクロール位置 (整数) がほぼ動かないので、タイマーを回し続けない
+KINETIC_MIN_SPEED = 30.0
+
+# 慣性スクロールで 1 ティックとして扱う最小間隔 (秒)。これより短い間隔で届いたティックは捨てる
+KINETIC_MIN_TICK_S = 1e-4
+
+# フリック速度の推定に使うドラッグ履歴の件数
+_DRAG_HISTORY = 8
+
+
 class ImageViewController(QObject):
     """Handles mouse/wheel interactions for the zoomable image view.
 
@@ -32,7 +44,8 @@ class ImageViewController(QObject):
       - img_label_proc (QLabel)
       - proc_scroll (QScrollArea)
       - proc_zoom: float
-      - _apply_proc_zoom(): redraws label pixmap according to proc_zoom and updates display geometry
+      - _apply_proc_zoom(fast=False): redraws label pixmap according to proc_zoom and updates display geometry
+        (fast=True renders a nearest-neighbour preview)
       - _display_to_full(QPoint) -> (x_full, y_full) or None
       - _full_to_display(x_full, y_full) -> (x_label, y_label) or None
       - _viewport_pos_to_label_pos(QPoint), _label_pos_to_viewport_pos(QPoint)
@@ -40,7 +53,7 @@ class ImageViewController(QObject):
       - _handle_image_click(QPoint)
       - _set_scroll(sx, sy)
       - pick_mode: None / 'add' / 'update'
-      - _display_pm_base (QPixmap) for clearing crosshair overlay
+      - img_label_proc.clear_crosshair() for clearing the crosshair overlay
     """
 
     def __init__(self, ui):
@@ -51,7 +64,9 @@ class ImageViewController(QObject):
         self._dragging = False
         self._drag_start_vp = None
         self._drag_start_scroll = (0, 0)
-        self._drag_recent = deque(maxlen=8)  # (t, QPoint)
+        # 最近のドラッグ位置 (t, x, y) のリングバッファ。移動イベントごとにタプル/QPoint を作らない
+        self._drag_buf = np.zeros((_DRAG_HISTORY, 3), dtype=np.float64)
+        self._drag_idx = 0  # これまでに書き込んだ件数 (次の書き込み位置は % _DRAG_HISTORY)
         # hover/select state
         self._hover_point_idx = None
         self._press_on_point_idx = None
@@ -63,6 +78,17 @@ class ImageViewController(QObject):
         self._kinetic_vx = 0.0
         self._kinetic_vy = 0.0
         self._kinetic_last_t = 0.0
+        # wheel zoom: 連続したホイールイベントは 1 回の再描画にまとめる
+        self._zoom_timer = QTimer(self)
+        self._zoom_timer.setSingleShot(True)
+        self._zoom_timer.setInterval(16)
+        self._zoom_timer.timeout.connect(self._apply_pending_zoom)
+        self._zoom_anchor = None  # (x_full, y_full) or None, pos_vp
+        # ホイール中は最近傍で速く描き、止まってから通常の補間で描き直す
+        self._zoom_hq_timer = QTimer(self)
+        self._zoom_hq_timer.setSingleShot(True)
+        self._zoom_hq_timer.setInterval(120)
+        self._zoom_hq_timer.timeout.connect(self._apply_hq_zoom)
 
         # install event filters
         ui.proc_scroll.viewport().installEventFilter(self)
@@ -94,8 +120,8 @@ class ImageViewController(QObject):
                     self.ui.proc_scroll.horizontalScrollBar().value(),
                     self.ui.proc_scroll.verticalScrollBar().value(),
                 )
-                self._drag_recent.clear()
-                self._drag_recent.append((monotonic(), QPoint(pos_vp)))
+                self._drag_idx = 0
+                self._push_drag(pos_vp)
                 self._stop_kinetic()
                 return True
             elif et == QEvent.MouseMove:
@@ -126,7 +152,7 @@ class ImageViewController(QObject):
                     if self._dragging:
                         sx0, sy0 = self._drag_start_scroll
                         self.ui._set_scroll(sx0 - dx, sy0 - dy)
-                        self._drag_recent.append((monotonic(), QPoint(pos_vp)))
+                        self._push_drag(pos_vp)
                         return True
                 # draw crosshair in pick modes when not dragging
                 if self.ui.pick_mode in ('add', 'update') and not self._dragging:
@@ -134,22 +160,13 @@ class ImageViewController(QObject):
             elif et == QEvent.MouseButtonRelease and event.button() == Qt.LeftButton:
                 pos_label = _evt_point(event) if obj is self.ui.img_label_proc else self.ui._viewport_pos_to_label_pos(_evt_point(event))
                 vx = vy = 0.0
-                if self._dragging and len(self._drag_recent) >= 2:
-                    t2, p2 = self._drag_recent[-1]
-                    t_cut = t2 - 0.12
-                    t1, p1 = self._drag_recent[0]
-                    for (tt, pp) in reversed(self._drag_recent):
-                        t1, p1 = (tt, pp)
-                        if tt <= t_cut:
-                            break
-                    dt = max(1e-3, t2 - t1)
-                    vx = -(p2.x() - p1.x()) / dt
-                    vy = -(p2.y() - p1.y()) / dt
+                if self._dragging and self._drag_idx >= 2:
+                    vx, vy = self._drag_velocity()
                 was_drag = self._dragging
                 self._mouse_pressed = False
                 self._dragging = False
                 self._drag_start_vp = None
-                self._drag_recent.clear()
+                self._drag_idx = 0
                 if not was_drag:
                     # 点選択が意図されていた場合はその点を選択、それ以外は既存のクリック処理
                     if self._press_on_point_idx is not None and self.ui.pick_mode is None:
@@ -173,8 +190,8 @@ class ImageViewController(QObject):
                         return True
                     else:
                         self.ui._handle_image_click(pos_label)
-                        if getattr(self.ui, '_display_pm_base', None) is not None:
-                            self.ui.img_label_proc.setPixmap(self.ui._display_pm_base)
+                        # 十字線はラベル側の上描きなので消すだけ (Pixmap の差し替えは不要)
+                        self.ui.img_label_proc.clear_crosshair()
                         return True
                 speed = (vx*vx + vy*vy) ** 0.5
                 if speed > 200:
@@ -193,18 +210,11 @@ class ImageViewController(QObject):
                 # Allow much larger zoom; rendering will downsample for display safety
                 new_zoom = max(0.01, min(1024.0, new_zoom))
                 if abs(new_zoom - self.ui.proc_zoom) > 1e-6:
+                    # 再描画は single-shot タイマーで最後の 1 回だけ行う
+                    # (表示はまだ前回の倍率なので、カーソル下のフル座標はそのまま使える)
                     self.ui.proc_zoom = new_zoom
-                    self.ui._apply_proc_zoom()
-                    if xf_yf is not None:
-                        x_full, y_full = xf_yf
-                        lx, ly = self.ui._full_to_display(x_full, y_full)
-                        sx = lx - pos_vp.x()
-                        sy = ly - pos_vp.y()
-                        self.ui._set_scroll(sx, sy)
-                    # ピックモード中は十字線を再描画
-                    if self.ui.pick_mode in ('add', 'update'):
-                        pos_label = self.ui._viewport_pos_to_label_pos(pos_vp)
-                        self.ui._draw_crosshair(pos_label)
+                    self._zoom_anchor = (xf_yf, QPoint(pos_vp))
+                    self._zoom_timer.start()
                 return True
             elif et == QEvent.Resize:
                 # ラベル/ビューポートのサイズ変更時に、ピックモードなら十字線を現在のカーソル位置で再描画
@@ -270,6 +280,58 @@ class ImageViewController(QObject):
         except Exception:
             return None
 
+    def _apply_pending_zoom(self):
+        # ホイールでまとめたズームを反映し、カーソル下の点が動かないようスクロールする
+        anchor = self._zoom_anchor
+        self._zoom_anchor = None
+        if anchor is None:
+            return
+        xf_yf, pos_vp = anchor
+        self.ui._apply_proc_zoom(fast=True)
+        # 倍率が高く通常描画も最近傍なら、描き直しは不要
+        if not uses_nearest(self.ui.proc_zoom, getattr(self.ui, 'interp_mode', 'auto')):
+            self._zoom_hq_timer.start()
+        if xf_yf is not None:
+            x_full, y_full = xf_yf
+            lx, ly = self.ui._full_to_display(x_full, y_full)
+            sx = lx - pos_vp.x()
+            sy = ly - pos_vp.y()
+            self.ui._set_scroll(sx, sy)
+        # ピックモード中は十字線を再描画
+        if self.ui.pick_mode in ('add', 'update'):
+            pos_label = self.ui._viewport_pos_to_label_pos(pos_vp)
+            self.ui._draw_crosshair(pos_label)
+
+    def _apply_hq_zoom(self):
+        # ホイールが止まったら同じ倍率を通常の補間で描き直す (サイズは同じなのでスクロールはそのまま)
+        if self._zoom_anchor is not None or self._zoom_timer.isActive():
+            return
+        self.ui._apply_proc_zoom()
+
+    def _push_drag(self, pos_vp):
+        """ドラッグ位置を時刻付きでリングバッファに書き込む。"""
+        row = self._drag_buf[self._drag_idx % _DRAG_HISTORY]
+        row[0] = monotonic()
+        row[1] = pos_vp.x()
+        row[2] = pos_vp.y()
+        self._drag_idx += 1
+
+    def _drag_velocity(self):
+        """
+        ドラッグ履歴からフリック速度 (px/秒, スクロール方向) を求める。
+
+        最新点と、そこから 0.12 秒以上前の最も新しい点 (無ければ最古の点) の差を使う。
+        """
+        n = min(self._drag_idx, _DRAG_HISTORY)
+        # 新しい順に並べたインデックス
+        order = (self._drag_idx - 1 - np.arange(n)) % _DRAG_HISTORY
+        hist = self._drag_buf[order]
+        t2, x2, y2 = hist[0]
+        older = np.flatnonzero(hist[:, 0] <= t2 - 0.12)
+        t1, x1, y1 = hist[older[0] if older.size else n - 1]
+        dt = max(1e-3, t2 - t1)
+        return -(x2 - x1) / dt, -(y2 - y1) / dt
+
     def _start_kinetic(self, vx, vy):
         self._kinetic_vx = float(vx)
         self._kinetic_vy = float(vy)
@@ -283,11 +345,16 @@ class ImageViewController(QObject):
         self._kinetic_vy = 0.0
 
     def _on_kinetic_tick(self):
+        if abs(self._kinetic_vx) < KINETIC_MIN_SPEED and abs(self._kinetic_vy) < KINETIC_MIN_SPEED:
+            self._stop_kinetic()
+            return
         t = monotonic()
-        dt = max(0.0, t - self._kinetic_last_t)
-        self._kinetic_last_t = t
-        if dt <= 0.0:
+        dt = t - self._kinetic_last_t
+        # タイマーが詰まって連続で届いたティックは捨てる (時刻は進めないので次のティックで移動量に含まれる)。
+        # 減衰はティックごとなので、ほぼ動かないティックで速度だけ落ちるのも防ぐ
+        if dt < KINETIC_MIN_TICK_S:
             return
+        self._kinetic_last_t = t
         hsb = self.ui.proc_scroll.horizontalScrollBar()
         vsb = self.ui.proc_scroll.verticalScrollBar()
         sx = hsb.value() + self._kinetic_vx * dt
@@ -310,5 +377,5 @@ class ImageViewController(QObject):
             self._kinetic_vx *= 0.3
         if hit_edge_y:
             self._kinetic_vy *= 0.3
-        if abs(self._kinetic_vx) < 5 and abs(self._kinetic_vy) < 5:
+        if abs(self._kinetic_vx) < KINETIC_MIN_SPEED and abs(self._kinetic_vy) < KINETIC_MIN_SPEED:
             self._stop_kinetic()
@@ -1,7 +1,197 @@
-from qt_compat.QtCore import QPoint
-from qt_compat.QtGui import QPixmap, QPainter, QPen, QColor
-from Util import cvimg_to_qpixmap
+from qt_compat.QtCore import Qt, QPoint
+from qt_compat.QtGui import QPixmap, QImage, QPainter, QPen, QColor
 import cv2
+import numpy as np
+
+
+# ズーム表示用リサイズの出力バッファ (同じ表示サイズが続くので使い回す)
+_resize_dst = None
+
+# キャンバス余白の色 (BGRA)
+CANVAS_BG_BGRA = (30, 30, 30, 255)
+
+# blend_edges_white の白ブレンド結果の一時バッファ (境界線の描き直しごとに確保しない)
+_blend_dst = None
+
+# これ以上の画素数 (入力か出力の大きい方) のリサイズは OpenCL (cv2.UMat) に回す。
+# 小さい画像では転送のコストの方が大きい
+UMAT_MIN_PIXELS = 3840 * 2160
+
+
+def _init_opencl():
+    """OpenCL が使えれば有効にして True を返す (使えない環境では False)。"""
+    try:
+        if cv2.ocl.haveOpenCL():
+            cv2.ocl.setUseOpenCL(True)
+            return bool(cv2.ocl.useOpenCL())
+    except Exception:
+        pass
+    return False
+
+
+_USE_UMAT = _init_opencl()
+
+
+def _resize_umat(src, size, interpolation):
+    """
+    cv2.UMat 経由で (OpenCL デバイス上で) リサイズして ndarray で返す。
+
+    失敗したら以降は CPU に戻すため _USE_UMAT を落として None を返す。
+    """
+    global _USE_UMAT
+    try:
+        return cv2.resize(cv2.UMat(src), size, interpolation=interpolation).get()
+    except Exception:
+        _USE_UMAT = False
+        return None
+
+
+def _resize_reuse(src, size, interpolation):
+    """
+    cv2.resize の出力を前回と同じ形状ならバッファに上書きして返す。
+
+    戻り値は次の呼び出しで上書きされるので、QPixmap に変換するまでの一時利用に限る。
+    大きな画像で OpenCL が使えるときはデバイス上でリサイズする (このときはバッファを使わない)。
+    """
+    global _resize_dst
+    w, h = size
+    if _USE_UMAT and max(src.shape[0] * src.shape[1], w * h) >= UMAT_MIN_PIXELS:
+        out = _resize_umat(src, (w, h), interpolation)
+        if out is not None:
+            return out
+    shape = (h, w) + tuple(src.shape[2:])
+    dst = _resize_dst
+    if dst is None or dst.shape != shape or dst.dtype != src.dtype:
+        dst = np.empty(shape, dtype=src.dtype)
+        _resize_dst = dst
+    return cv2.resize(src, (w, h), dst=dst, interpolation=interpolation)
+
+
+def _compose_canvas(img, pad):
+    """
+    img (BGR) を余白 pad 付きのキャンバス (QImage) に書き込んで返す。
+
+    キャンバスは呼び出しごとに QImage として確保し、その画素を numpy で参照して直接書き込む
+    (中間の BGRA 配列を作ってから QImage へコピーしない)。メモリは QImage が持つので、
+    返した QImage や、そこから作った QPixmap は後の呼び出しで書き換わらない。
+    """
+    h, w = img.shape[:2]
+    ch, cw = h + 2 * pad, w + 2 * pad
+    canvas = QImage(cw, ch, QImage.Format_RGB32)
+    # リトルエンディアンの BGRA 並びは Format_RGB32 (0xffRRGGBB) と同じ
+    buf = np.frombuffer(canvas.bits(), dtype=np.uint8).reshape(ch, canvas.bytesPerLine() // 4, 4)[:, :cw]
+    if pad > 0:
+        buf[:pad] = CANVAS_BG_BGRA
+        buf[pad + h:] = CANVAS_BG_BGRA
+        buf[pad:pad + h, :pad] = CANVAS_BG_BGRA
+        buf[pad:pad + h, pad + w:] = CANVAS_BG_BGRA
+    cv2.cvtColor(img, cv2.COLOR_BGR2BGRA, dst=buf[pad:pad + h, pad:pad + w])
+    return canvas
+
+
+def blend_edges_white(img, edge_mask, weight):
+    """
+    境界マスクの画素だけ白を weight の割合でブレンドする (uint8 のまま)。
+
+    float 配列を作らず、cv2.addWeighted (SIMD) と cv2.copyTo で処理する。
+    ブレンド結果の一時バッファは同じ形状なら使い回す。
+
+    Args:
+        img: BGR 画像 (uint8)。edge_mask の画素が上書きされる
+        edge_mask: 0/255 の境界マスク (H, W)
+        weight: 白の割合 (0..1)
+
+    Returns:
+        img
+    """
+    if img.dtype != np.uint8:
+        img = np.clip(img, 0, 255).astype(np.uint8)
+    if edge_mask.dtype != np.uint8:
+        edge_mask = edge_mask.astype(np.uint8)
+    global _blend_dst
+    wt = float(weight)
+    dst = _blend_dst
+    if dst is None or dst.shape != img.shape:
+        dst = np.empty_like(img)
+        _blend_dst = dst
+    # img * (1 - wt) + 255 * wt
+    blended = cv2.addWeighted(img, 1.0 - wt, img, 0.0, 255.0 * wt, dst=dst)
+    cv2.copyTo(blended, edge_mask, img)
+    return img
+
+
+def _pack_bgr(img):
+    """BGR 画像 (uint8) を 1 画素 1 要素の uint32 (H, W) にする (色の一致判定用)。"""
+    h, w = img.shape[:2]
+    return cv2.cvtColor(img, cv2.COLOR_BGR2BGRA).view(np.uint32).reshape(h, w)
+
+
+def color_boundary_mask(img):
+    """
+    隣の画素と色が違う画素を 255 にしたマスクを返す (左隣・上隣との比較)。
+
+    BGR を BGRA に詰めて 32bit 整数として見ることで、1 画素 1 回の比較で済ませる
+    (チャンネルごとの比較と axis=2 の any を行わない)。比較は cv2.compare で
+    0/255 を直接マスクに書き込む (bool の一時配列と *255 のパスを作らない)。
+
+    Args:
+        img: BGR 画像 (uint8, H x W x 3)
+
+    Returns:
+        0/255 のマスク (H, W) uint8
+    """
+    h, w = img.shape[:2]
+    # cv2.compare は uint32 を扱えないので int32 として見る (一致判定には影響しない)
+    packed = _pack_bgr(img).view(np.int32)
+    mask = np.zeros((h, w), dtype=np.uint8)
+    if w > 1:
+        cv2.compare(packed[:, 1:], packed[:, :-1], cv2.CMP_NE, dst=mask[:, 1:])
+    if h > 1:
+        cv2.bitwise_or(mask[1:, :], cv2.compare(packed[1:, :], packed[:-1, :], cv2.CMP_NE), dst=mask[1:, :])
+    return mask
+
+
+def trim_color_regions(img, k):
+    """
+    同じ色の領域をそれぞれ 3x3 で k 回 erode し、削れた画素を黒 (0) にした画像を返す。
+
+    色ごとに inRange + erode するのと同じ結果を、色数によらず全体 2 パスで求める:
+    8 近傍に別の色がある画素 (境界) からのチェビシェフ距離が k 以上の画素だけが残る。
+
+    Args:
+        img: BGR 画像 (uint8, H x W x 3)
+        k: erode の回数 (1 以上)
+
+    Returns:
+        img と同じ形の新しい配列
+    """
+    h, w = img.shape[:2]
+    packed = _pack_bgr(img)
+    edge = np.zeros((h, w), dtype=bool)
+    # 横・縦・斜め 2 方向で隣と色が違えば、両側の画素を境界にする
+    for (ya, xa), (yb, xb) in (
+        ((slice(None), slice(1, None)), (slice(None), slice(None, -1))),
+        ((slice(1, None), slice(None)), (slice(None, -1), slice(None))),
+        ((slice(1, None), slice(1, None)), (slice(None, -1), slice(None, -1))),
+        ((slice(1, None), slice(None, -1)), (slice(None, -1), slice(1, None))),
+    ):
+        ne = packed[ya, xa] != packed[yb, xb]
+        edge[ya, xa] |= ne
+        edge[yb, xb] |= ne
+    dist = cv2.distanceTransform(np.logical_not(edge).view(np.uint8), cv2.DIST_C, 3)
+    out = np.zeros_like(img)
+    cv2.copyTo(img, (dist >= int(k)).view(np.uint8), out)
+    return out
+
+
+def uses_nearest(proc_zoom, interp_mode='auto'):
+    """build_zoomed_canvas が最近傍補間で描くかどうか (interp_mode: 'auto'|'nearest'|'linear')。"""
+    if interp_mode == 'nearest':
+        return True
+    if interp_mode == 'linear':
+        return False
+    # auto: if zoom is large (enlarging), prefer nearest to preserve pixel blocks
+    return max(0.001, float(proc_zoom)) > 1.5
 
 
 def build_zoomed_canvas(overlay_full_img, proc_zoom, view_padding,
@@ -37,44 +227,38 @@ def build_zoomed_canvas(overlay_full_img, proc_zoom, view_padding,
     MAX_PIXELS = 6144 * 6144
     desired_pixels = float(w) * float(h) * (z * z)
     # decide interpolation method
-    # interp_mode: 'auto'|'nearest'|'linear'
-    use_nearest = False
-    if interp_mode == 'nearest':
-        use_nearest = True
-    elif interp_mode == 'linear':
-        use_nearest = False
-    else:
-        # auto: if zoom is large (enlarging), prefer nearest to preserve pixel blocks
-        use_nearest = (z > 1.5)
+    use_nearest = uses_nearest(z, interp_mode)
+
+    def _interp(dw):
+        if use_nearest:
+            return cv2.INTER_NEAREST
+        # auto で縮小するときは INTER_AREA (速く、モアレも出にくい)
+        if interp_mode == 'auto' and dw < w:
+            return cv2.INTER_AREA
+        return cv2.INTER_LINEAR
 
     if desired_pixels > MAX_PIXELS:
         scale_down = (MAX_PIXELS / float(desired_pixels)) ** 0.5
         # compute draw size directly from w * z * scale_down to avoid constructing huge intermediate sizes
         draw_w = max(1, int(round(float(w) * z * scale_down)))
         draw_h = max(1, int(round(float(h) * z * scale_down)))
-        interp = cv2.INTER_LINEAR if not use_nearest else cv2.INTER_NEAREST
-        img_resized = cv2.resize(overlay_full_img, (draw_w, draw_h), interpolation=interp)
+        img_resized = _resize_reuse(overlay_full_img, (draw_w, draw_h), _interp(draw_w))
         downsampled = True
         # ds_factor maps drawn pixels to the logical zoomed size (w*z)
         ds_factor = float(draw_w) / (float(w) * z)
     else:
         draw_w = max(1, int(round(float(w) * z)))
         draw_h = max(1, int(round(float(h) * z)))
-        interp = cv2.INTER_NEAREST if use_nearest else cv2.INTER_LINEAR
-        img_resized = cv2.resize(overlay_full_img, (draw_w, draw_h), interpolation=interp)
+        img_resized = _resize_reuse(overlay_full_img, (draw_w, draw_h), _interp(draw_w))
         downsampled = False
         ds_factor = 1.0
 
     pad = int(view_padding)
-    canvas_w = img_resized.shape[1] + 2 * pad
-    canvas_h = img_resized.shape[0] + 2 * pad
-    pm = QPixmap(canvas_w, canvas_h)
-    pm.fill(QColor(30, 30, 30))
-    painter = QPainter(pm)
+    # 余白付きのキャンバスに直接書き込み、マーカーもその QImage に描く
+    # (キャンバス QPixmap の確保・塗りつぶしと、縮小画像の QPixmap 変換・drawPixmap を省く)
+    canvas = _compose_canvas(img_resized, pad)
+    painter = QPainter(canvas)
     painter.setRenderHint(QPainter.Antialiasing, True)
-    # draw resized pixmap; if downsampled we will still compute coordinates scaled to the displayed size
-    qpix = cvimg_to_qpixmap(img_resized)
-    painter.drawPixmap(pad, pad, qpix)
 
     # Compute offsets in logical (label) coordinates. If the image was downsampled,
     # a physical pad of 'pad' pixels corresponds to pad * (1/ds_factor) logical pixels.
@@ -102,17 +286,19 @@ def build_zoomed_canvas(overlay_full_img, proc_zoom, view_padding,
 
     # 1) 通常重心
     if centroids:
+        # ペン・ブラシ・半径は全点共通なのでループの外で一度だけ設定する
+        painter.setPen(QPen(QColor(255, 255, 255), cfg['pen_width']))
+        painter.setBrush(cfg['centroid_fill'])
+        r = cfg['centroid_radius']
+        sel = selected_index if selected_index is not None else -1
+        draw_ellipse = painter.drawEllipse
         for idx, (_, xp, yp) in enumerate(centroids):
-            xf = xp * scale_proc_to_full
-            yf = yp * scale_proc_to_full
-            # use display_scale for mapping full-image coords to physical pixels
-            xd = int(round(xf * display_scale)) + off_x
-            yd = int(round(yf * display_scale)) + off_y
-            if selected_index is not None and idx == selected_index:
+            if idx == sel:
                 continue
-            painter.setPen(QPen(QColor(255, 255, 255), cfg['pen_width']))
-            painter.setBrush(cfg['centroid_fill'])
-            painter.drawEllipse(QPoint(xd, yd), cfg['centroid_radius'], cfg['centroid_radius'])
+            # use display_scale for mapping full-image coords to physical pixels
+            xd = int(round((xp * scale_proc_to_full) * display_scale)) + off_x
+            yd = int(round((yp * scale_proc_to_full) * display_scale)) + off_y
+            draw_ellipse(QPoint(xd, yd), r, r)
 
     # 2) Ref
     for pt in (ref_points or []):
@@ -139,6 +325,7 @@ def build_zoomed_canvas(overlay_full_img, proc_zoom, view_padding,
         painter.drawEllipse(QPoint(xd, yd), cfg['selected_radius'], cfg['selected_radius'])
 
     painter.end()
+    pm = QPixmap.fromImage(canvas, Qt.NoFormatConversion)
     # return actual drawn image physical size (img_resized) and logical display size (width,height)
     # physical drawn size (in pixels inside the pixmap)
     draw_w = img_resized.shape[1]
@@ -146,20 +333,21 @@ def build_zoomed_canvas(overlay_full_img, proc_zoom, view_padding,
     return pm, (off_x, off_y), (draw_w, draw_h)
 
 
-def draw_crosshair(base_pixmap, display_offset, display_img_size, pos_label,
-                   outline_color=QColor(0, 0, 0), outline_width=4,
-                   line_color=QColor(255, 255, 255), line_width=2):
-    """白＋黒縁取りの十字線をベースPixmapに描いて返す。"""
-    if base_pixmap is None:
-        return None
+def paint_crosshair(painter, display_offset, display_img_size, pos_label,
+                    outline_color=QColor(0, 0, 0), outline_width=4,
+                    line_color=QColor(255, 255, 255), line_width=2):
+    """
+    白＋黒縁取りの十字線を painter に描く (画像の表示範囲内にクランプ)。
+
+    Returns:
+        描いた十字線の中心 (x, y)。表示サイズが 0 のときは None
+    """
     pad_x, pad_y = display_offset
     w, h = display_img_size
     if w <= 0 or h <= 0:
-        return base_pixmap
+        return None
     x = min(max(pos_label.x(), pad_x), pad_x + w - 1)
     y = min(max(pos_label.y(), pad_y), pad_y + h - 1)
-    pm2 = QPixmap(base_pixmap)
-    painter = QPainter(pm2)
     painter.setRenderHint(QPainter.Antialiasing, True)
     painter.setPen(QPen(outline_color, outline_width))
     painter.drawLine(pad_x, y, pad_x + w - 1, y)
@@ -167,5 +355,21 @@ def draw_crosshair(base_pixmap, display_offset, display_img_size, pos_label,
     painter.setPen(QPen(line_color, line_width))
     painter.drawLine(pad_x, y, pad_x + w - 1, y)
     painter.drawLine(x, pad_y, x, pad_y + h - 1)
+    return x, y
+
+
+def draw_crosshair(base_pixmap, display_offset, display_img_size, pos_label,
+                   outline_color=QColor(0, 0, 0), outline_width=4,
+                   line_color=QColor(255, 255, 255), line_width=2):
+    """白＋黒縁取りの十字線をベースPixmapのコピーに描いて返す。"""
+    if base_pixmap is None:
+        return None
+    w, h = display_img_size
+    if w <= 0 or h <= 0:
+        return base_pixmap
+    pm2 = QPixmap(base_pixmap)
+    painter = QPainter(pm2)
+    paint_crosshair(painter, display_offset, display_img_size, pos_label,
+                    outline_color, outline_width, line_color, line_width)
     painter.end()
     return pm2
@@ -109,6 +109,32 @@ def fix_ref_table_width(table_ref):
         pass
 
 
+def tables_height_key(table_ref, table):
+    """
+    fix_tables_height の結果を左右する値の組 (フォント高さ, ヘッダ高さ, 行数, 横スクロールバー要否)。
+
+    横スクロールバーの rangeChanged はウィンドウのリサイズ中に何度も来るので、
+    このキーが前回と同じなら高さの再計算を省ける。
+    """
+    try:
+        hsb = table.horizontalScrollBar()
+        return (
+            table.fontMetrics().height(),
+            max(table_ref.horizontalHeader().height(), table.horizontalHeader().height()),
+            table_ref.rowCount(),
+            table.rowCount(),
+            (hsb.maximum() > 0) or hsb.isVisible(),
+        )
+    except Exception:
+        return None
+
+
+def _set_fixed_height_if_changed(widget, h):
+    # 同じ値での setFixedHeight でもレイアウトの再計算が走るので、変化したときだけ設定する
+    if widget.minimumHeight() != h or widget.maximumHeight() != h:
+        widget.setFixedHeight(h)
+
+
 # 両テーブルの行高さを内容に合わせて調整
 def fix_tables_height(table_ref, table):
     try:
@@ -142,16 +168,19 @@ def fix_tables_height(table_ref, table):
         hsb_h = hsb.sizeHint().height() if need_hsb else 0
         margin = 2
         total_h = header_h + rows_h + frame + hsb_h + margin
-        table_ref.setFixedHeight(total_h)
-        table.setFixedHeight(total_h)
+        _set_fixed_height_if_changed(table_ref, total_h)
+        _set_fixed_height_if_changed(table, total_h)
     except Exception:
         pass
 
 
 # 両テーブルにデータを投入し、レイアウトを調整
 def populate_tables(table_ref, table, ref_points, ref_obs, centroids, selected_index, ref_selected_index, flip_mode='auto', visible_ref_cols=None):
+    # 投入中はシグナルと再描画を止め、セルごとの itemChanged/再描画を起こさない
     table.blockSignals(True)
     table_ref.blockSignals(True)
+    table.setUpdatesEnabled(False)
+    table_ref.setUpdatesEnabled(False)
     try:
         # 左テーブル（Ref）: 右表と下揃えにし、残差行（Res.*）を追加
         row_labels_ref = STR.TABLE_LEFT_ROW_LABELS
@@ -223,7 +252,7 @@ def populate_tables(table_ref, table, ref_points, ref_obs, centroids, selected_i
             table_ref.setItem(DATA_ROW_OFFSET + 6, c, ry)
             table_ref.setItem(DATA_ROW_OFFSET + 7, c, rz)
             table_ref.setItem(DATA_ROW_OFFSET + 8, c, rr)
-        table_ref.resizeColumnsToContents()
+        # 列幅は fix_ref_table_width が固定幅に揃えるので resizeColumnsToContents は不要
         fix_ref_table_width(table_ref)
 
         # 右テーブル（重心リスト）: Lv 行は不要
@@ -478,3 +507,6 @@ def populate_tables(table_ref, table, ref_points, ref_obs, centroids, selected_i
     finally:
         table.blockSignals(False)
         table_ref.blockSignals(False)
+        for t in (table, table_ref):
+            t.setUpdatesEnabled(True)
+            t.viewport().update()
@@ -0,0 +1,63 @@
+"""last_boundary_mask が成分ごとの findContours(RETR_EXTERNAL) の描画と一致するかの確認"""
+
+import os
+
+import cv2
+import numpy as np
+import pytest
+
+from CalcCentroid import CentroidProcessor, label_edges, label_boundary_mask
+from Util import kmeans_posterize
+
+DEMO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "DemoBMP.bmp")
+
+
+def _external_contours(label_img, accepted):
+    out = np.zeros(label_img.shape, dtype=np.uint8)
+    for lab in accepted:
+        comp = (label_img == lab).astype(np.uint8) * 255
+        contours, _ = cv2.findContours(comp, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        cv2.drawContours(out, contours, -1, 255, 1)
+    return out
+
+
+@pytest.mark.skipif(not os.path.exists(DEMO), reason="DemoBMP.bmp がない")
+@pytest.mark.parametrize("levels,trim_px,min_area", [(4, 0, 0), (8, 0, 30), (8, 3, 0)])
+def test_demo_boundary_matches_external_contours(levels, trim_px, min_area):
+    img = cv2.imread(DEMO)
+    h, w = img.shape[:2]
+    scale = 640 / w
+    proc = cv2.resize(img, (640, int(round(h * scale))), interpolation=cv2.INTER_AREA)
+    poster = kmeans_posterize(proc, levels)
+    cp = CentroidProcessor(proc, 1.0 / scale, img)
+    cp.get_centroids(dict(levels=levels, min_area=min_area, max_area=None,
+                          trim_px=trim_px, neck_separation=0), poster=poster)
+
+    # 変更前の処理 (色ごと・成分ごとの findContours) で描いた境界
+    trim_proc = int(round(trim_px * scale))
+    expected = np.zeros(poster.shape[:2], dtype=np.uint8)
+    for color in np.unique(poster.reshape(-1, 3), axis=0):
+        mask = cv2.inRange(poster, color, color)
+        if trim_proc > 0:
+            mask = cv2.erode(mask, np.ones((3, 3), np.uint8), iterations=trim_proc)
+        n, lab, stats, _ = cv2.connectedComponentsWithStats(mask, connectivity=4)
+        accepted = [i for i in range(1, n) if stats[i, cv2.CC_STAT_AREA] >= min_area]
+        expected |= _external_contours(lab, accepted)
+
+    assert np.array_equal(cp.last_boundary_mask > 0, expected > 0)
+
+
+def test_hole_edges_are_not_drawn():
+    # 穴のある成分 (1) と穴の中の成分 (2)、斜めに接する 2 成分 (3, 4) で囲んだ領域
+    lab = np.zeros((12, 16), dtype=np.int32)
+    lab[1:9, 1:9] = 1
+    lab[3:7, 3:7] = 0
+    lab[4:6, 4:6] = 2
+    lab[2:5, 11:13] = 3
+    lab[5:8, 13:15] = 4
+    lab[5, 11] = 3
+    lab[4, 13] = 4
+    edge_idx, edge_lab = label_edges(lab)
+    got = label_boundary_mask(np.zeros(lab.shape, np.uint8), edge_idx, edge_lab,
+                              np.arange(1, 5), 5)
+    assert np.array_equal(got, _external_contours(lab, range(1, 5)))
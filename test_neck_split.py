@@ -0,0 +1,23 @@
+"""くびれ分割の面積下限 (min_split_area) で分割の結果が変わらないかの確認"""
+
+import itertools
+
+import numpy as np
+import pytest
+
+from CalcCentroid import CentroidProcessor
+
+
+@pytest.mark.parametrize("k", [1, 2])
+@pytest.mark.parametrize("shape", [(2, 3), (3, 3)])
+def test_split_floor_keeps_border_components(k, shape):
+    # 画像の端に接する小さな成分も、下限なしのときと同じように分割されること
+    h, w = shape
+    floor = 2 * k * k + 2 * k + 2
+    cp = CentroidProcessor(np.zeros((h, w, 3), np.uint8), 1.0, None)
+    for bits in itertools.product((0, 1), repeat=h * w):
+        fg = np.array(bits, dtype=np.uint8).reshape(h, w)
+        label_img = np.where(fg > 0, 0, 1).astype(np.int32)
+        got = cp._label_group(1, label_img, 0, k, floor)
+        want = cp._label_group(1, label_img, 0, k, 0)
+        assert np.array_equal(np.sort(got["areas"]), np.sort(want["areas"])), fg
@@ -1,5 +1,7 @@
-from qt_compat.QtWidgets import QSlider, QStyle, QStyledItemDelegate, QLineEdit, QAbstractItemDelegate
-from qt_compat.QtCore import Qt
+from qt_compat.QtWidgets import QSlider, QStyle, QStyledItemDelegate, QLineEdit, QAbstractItemDelegate, QLabel
+from qt_compat.QtCore import Qt, QRect
+from qt_compat.QtGui import QPainter
+from rendering import paint_crosshair
 
 # Pylance対策: Qt列挙を定数に退避
 QT_LEFT_BUTTON = getattr(Qt, "LeftButton", 0)
@@ -44,6 +46,69 @@ class ClickableSlider(QSlider):
         event.accept()
 
 
+class CrosshairLabel(QLabel):
+    """十字線を paintEvent で上描きする画像ラベル。
+
+    マウス移動ごとにベース Pixmap をコピーして十字線を焼き込む代わりに、
+    ラベルの Pixmap はベースのままにして十字線だけを描き、
+    前回と今回の線の周辺だけを再描画する。座標はラベル (= Pixmap) 座標。
+    """
+
+    # 十字線の再描画範囲 (線幅の半分 + アンチエイリアス分)
+    _LINE_MARGIN = 4
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._crosshair = None  # (pos_label, display_offset, display_img_size)
+        self._dirty_rects = None  # 最後に描いた線の更新範囲
+
+    def set_crosshair(self, pos_label, display_offset, display_img_size):
+        self._crosshair = (pos_label, tuple(display_offset), tuple(display_img_size))
+        self._update_crosshair_region()
+
+    def clear_crosshair(self):
+        if self._crosshair is None:
+            return
+        self._crosshair = None
+        self._update_crosshair_region()
+
+    def _crosshair_rects(self, xy, display_offset, display_img_size):
+        x, y = xy
+        pad_x, pad_y = display_offset
+        w, h = display_img_size
+        m = self._LINE_MARGIN
+        return (QRect(pad_x - m, y - m, w + 2 * m, 2 * m + 1),
+                QRect(x - m, pad_y - m, 2 * m + 1, h + 2 * m))
+
+    def _update_crosshair_region(self):
+        # 前回の線を消し、今回の線を描くのに必要な帯だけ更新する
+        old = self._dirty_rects
+        if old is not None:
+            for r in old:
+                self.update(r)
+        self._dirty_rects = None
+        if self._crosshair is not None:
+            pos_label, off, size = self._crosshair
+            if size[0] > 0 and size[1] > 0:
+                x = min(max(pos_label.x(), off[0]), off[0] + size[0] - 1)
+                y = min(max(pos_label.y(), off[1]), off[1] + size[1] - 1)
+                rects = self._crosshair_rects((x, y), off, size)
+                self._dirty_rects = rects
+                for r in rects:
+                    self.update(r)
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if self._crosshair is None:
+            return
+        pos_label, off, size = self._crosshair
+        painter = QPainter(self)
+        try:
+            paint_crosshair(painter, off, size, pos_label)
+        finally:
+            painter.end()
+
+
 class RefTableDelegate(QStyledItemDelegate):
     """左テーブル（Ref）の編集ナビゲーション用デリゲート。
 